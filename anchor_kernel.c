@@ -0,0 +1,68 @@
+/* ============================================================================
+ * C implementation of the fused Law I sweep (heuristics-test.py).
+ *
+ * Mirrors the Numba kernel: expanding odd-distance search over the
+ * bit-packed odd-number sieve (bit j stands for 2j+1), with the mod-6
+ * wheel for anchors divisible by 6. Built as the optional _anchor
+ * extension by build_anchor.py; heuristics-test.py uses it when Numba
+ * is not installed.
+ * ==========================================================================*/
+
+#include <stdint.h>
+
+static inline int odd_prime_bit(const uint8_t *odd_bits, int64_t x)
+{
+    int64_t j = x >> 1;
+    return (odd_bits[j >> 3] >> (j & 7)) & 1;
+}
+
+static int64_t nearest_odd_distance(const uint8_t *odd_bits, int64_t s,
+                                    int64_t limit)
+{
+    int64_t d = 1;
+    if (s % 6 == 0) {
+        /* s +/- d divisible by 3 can never be the nearest prime here,
+         * so d skips 3, 9, 15, ... by alternating steps of 4 and 2. */
+        int64_t step = 4;
+        while (d <= limit) {
+            if (odd_prime_bit(odd_bits, s - d) ||
+                odd_prime_bit(odd_bits, s + d))
+                return d;
+            d += step;
+            step = 6 - step;
+        }
+    } else {
+        while (d <= limit) {
+            if (odd_prime_bit(odd_bits, s - d) ||
+                odd_prime_bit(odd_bits, s + d))
+                return d;
+            d += 2;
+        }
+    }
+    return 0;
+}
+
+static int is_clean_anchor(const uint8_t *odd_bits, int64_t s, int64_t limit)
+{
+    int64_t k_min = nearest_odd_distance(odd_bits, s, limit);
+    if (k_min == 1)
+        return 1;
+    if (k_min > 1)
+        return odd_prime_bit(odd_bits, k_min);
+    return 0;
+}
+
+void anchor_sweep(const int64_t *s_true, const int64_t *s_even,
+                  const int64_t *s_mod6, int64_t n,
+                  const uint8_t *odd_bits, int64_t limit, int64_t *out)
+{
+    int64_t clean_true = 0, clean_even = 0, clean_mod6 = 0;
+    for (int64_t i = 0; i < n; i++) {
+        clean_true += is_clean_anchor(odd_bits, s_true[i], limit);
+        clean_even += is_clean_anchor(odd_bits, s_even[i], limit);
+        clean_mod6 += is_clean_anchor(odd_bits, s_mod6[i], limit);
+    }
+    out[0] = clean_true;
+    out[1] = clean_even;
+    out[2] = clean_mod6;
+}
@@ -0,0 +1,28 @@
+# ==============================================================================
+# Builds the optional _anchor C extension (see anchor_kernel.c) with cffi.
+# Run once:  python build_anchor.py
+# heuristics-test.py picks the extension up automatically when Numba is
+# not installed; without either, it falls back to interpreted sweeps.
+# ==============================================================================
+from cffi import FFI
+
+ffibuilder = FFI()
+
+ffibuilder.cdef("""
+void anchor_sweep(const int64_t *s_true, const int64_t *s_even,
+                  const int64_t *s_mod6, int64_t n,
+                  const uint8_t *odd_bits, int64_t limit, int64_t *out);
+""")
+
+ffibuilder.set_source(
+    "_anchor",
+    '#include <stdint.h>\n'
+    'void anchor_sweep(const int64_t *s_true, const int64_t *s_even,\n'
+    '                  const int64_t *s_mod6, int64_t n,\n'
+    '                  const uint8_t *odd_bits, int64_t limit, int64_t *out);\n',
+    sources=["anchor_kernel.c"],
+    extra_compile_args=["-O3"],
+)
+
+if __name__ == "__main__":
+    ffibuilder.compile(verbose=True)
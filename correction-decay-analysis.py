@@ -5,9 +5,16 @@
 # quantitative analysis of the "deterministic decay."
 # ==============================================================================
 
+import gc
 import math
+import os
 import time
 
+import numpy as np
+
+from prime_sieve import load_primes_from_file
+from numba import njit, prange, get_num_threads, get_thread_id
+
 # --- Configuration ---
 # -- Generate Prime sets first using generate-primes.py --
 PRIME_INPUT_FILE = "primes_100m.txt"
@@ -15,20 +22,85 @@ MAX_PRIME_PAIRS_TO_TEST = 50000000
 MAX_CORRECTION_RADIUS = 20
 DECAY_ANALYSIS_INTERVAL = 100000 # Analyze the decay every 100,000 pairs
 
-# --- Function to load primes from a file ---
-def load_primes_from_file(filename):
-    """Loads a list of primes from a text file."""
-    print(f"Loading primes from {filename}...")
-    start_time = time.time()
-    try:
-        with open(filename, 'r') as f:
-            prime_list = [int(line.strip()) for line in f]
-    except FileNotFoundError:
-        print(f"FATAL ERROR: The prime file '{filename}' was not found.")
-        return None
-    end_time = time.time()
-    print(f"Loaded {len(prime_list):,} primes in {end_time - start_time:.2f} seconds.")
-    return prime_list
+# --- Compiled scan kernel ---
+@njit(cache=True, parallel=True, boundscheck=False)
+def scan_interval(anchors, is_prime, start, end, max_r):
+    """Scans pairs [start, end) in compiled code, parallelized across cores.
+
+    Returns (corrections_by_radius, exceptions, uncorrected, fail_i, fail_q,
+    fail_k): a per-radius int64 histogram, the number of Law I exceptions
+    seen, how many of them no anchor within max_r could fix, and the pair
+    index / target prime / composite k of one uncorrected exception
+    (fail_i is -1 when every exception was corrected). Compiled code cannot
+    append failure dicts to a Python list, so the details come back as
+    plain scalars instead. Pairs are independent, so the loop runs under
+    prange with one accumulator row per thread (no shared writes); the rows
+    are reduced before returning. All I/O and dict building stays on the
+    Python side.
+    """
+    n_threads = get_num_threads()
+    corrections_tl = np.zeros((n_threads, max_r + 1), dtype=np.int64)
+    exceptions_tl = np.zeros(n_threads, dtype=np.int64)
+    uncorrected_tl = np.zeros(n_threads, dtype=np.int64)
+    fail_i_tl = np.full(n_threads, -1, dtype=np.int64)
+    fail_q_tl = np.zeros(n_threads, dtype=np.int64)
+    fail_k_tl = np.zeros(n_threads, dtype=np.int64)
+
+    for i in prange(start, end):
+        tid = get_thread_id()
+        anchor_sum = anchors[i]
+
+        min_distance_k = 0
+        search_dist = 1
+        while True:
+            # Bitwise | instead of a short-circuit or: one branch-free test
+            # per step, with both independent loads free to issue together.
+            # The sieve's zero tail keeps the upper probe in bounds.
+            if is_prime[anchor_sum - search_dist] | is_prime[anchor_sum + search_dist]:
+                min_distance_k = search_dist
+                break
+            search_dist += 1
+
+        # k=1 dominates (twin-like adjacency); bail out before even probing
+        # the sieve for it. Prime k is the next most common clean case.
+        if min_distance_k == 1 or is_prime[min_distance_k]:
+            continue
+
+        exceptions_tl[tid] += 1
+
+        if is_prime[anchor_sum - min_distance_k]:
+            q_prime = anchor_sum - min_distance_k
+        else:
+            q_prime = anchor_sum + min_distance_k
+
+        is_corrected = False
+        for radius in range(1, max_r + 1):
+            # Only the radius matters for the decay stats, so both
+            # neighbors fold into one branch-free test per radius.
+            k_prev = abs(anchors[i - radius] - q_prime)
+            k_next = abs(anchors[i + radius] - q_prime)
+            if (k_prev == 1) | (k_next == 1) | is_prime[k_prev] | is_prime[k_next]:
+                is_corrected = True
+                corrections_tl[tid, radius] += 1
+                break
+
+        if not is_corrected:
+            uncorrected_tl[tid] += 1
+            fail_i_tl[tid] = i
+            fail_q_tl[tid] = q_prime
+            fail_k_tl[tid] = min_distance_k
+
+    fail_i = np.int64(-1)
+    fail_q = np.int64(0)
+    fail_k = np.int64(0)
+    for t in range(n_threads):
+        if fail_i_tl[t] >= 0 and (fail_i < 0 or fail_i_tl[t] < fail_i):
+            fail_i = fail_i_tl[t]
+            fail_q = fail_q_tl[t]
+            fail_k = fail_k_tl[t]
+
+    return (corrections_tl.sum(axis=0), exceptions_tl.sum(), uncorrected_tl.sum(),
+            fail_i, fail_q, fail_k)
 
 # --- Main Testing Logic ---
 def test_correction_law():
@@ -43,80 +115,86 @@ def test_correction_law():
         # ... (error reporting)
         return
 
-    print("\nSafety check passed. Creating prime set for fast lookups...")
-    prime_set = set(prime_list)
-    print("Prime set created. Starting analysis...")
+    # Dense uint8 sieve: each membership probe is one indexed load instead of
+    # a Python set hash+compare. Padded so anchor_sum + search_dist stays in
+    # bounds. generate-prime.py persists this sieve, so prefer memory-mapping
+    # it and let the page cache fault in only the bytes actually touched.
+    max_prime = prime_list[-1]
+    sieve_size = max_prime + MAX_CORRECTION_RADIUS * 300
+    sieve_path = os.path.splitext(PRIME_INPUT_FILE)[0] + '.sieve'
+    if os.path.exists(sieve_path) and os.path.getsize(sieve_path) >= sieve_size:
+        print(f"\nSafety check passed. Memory-mapping prime sieve from {sieve_path}...")
+        is_prime = np.memmap(sieve_path, dtype=np.uint8, mode='r')
+    else:
+        print("\nSafety check passed. Building prime bit-sieve for fast lookups...")
+        is_prime = np.zeros(sieve_size, dtype=np.uint8)
+        is_prime[prime_list] = 1
+    print("Prime sieve built. Starting analysis...")
     print("-" * 80)
     start_time = time.time()
-    
-    # --- Data structures for the new decay analysis ---
-    decay_stats = {}
-    interval_exceptions = 0
-    interval_corrections = {}
-
-    # --- Data structures for the main report ---
-    total_successful_corrections = {}
-    correction_failures = []
+
+    # Anchor sums S_n = p_n + p_{n+1}, one vector add; the kernel indexes
+    # this array instead of re-adding prime pairs per iteration.
+    anchors = prime_list[:-1] + prime_list[1:]
+
+    # The scan only touches anchors and the sieve from here on, so the raw
+    # prime array can go: ~800MB less resident memory at full scale, which
+    # is less competition for the cache lines the sieve probes live in.
+    del prime_list
+    gc.collect()
+
+    # --- Data structures for the decay analysis ---
+    # The per-interval report only ever prints r=1 and r<=2, so that is all
+    # that gets tracked per interval; the full radius histogram is only kept
+    # as a single global tally.
+    num_intervals = MAX_PRIME_PAIRS_TO_TEST // DECAY_ANALYSIS_INTERVAL + 1
+    interval_r1 = np.zeros(num_intervals, dtype=np.int64)
+    interval_r2 = np.zeros(num_intervals, dtype=np.int64)
+    interval_exceptions = np.zeros(num_intervals, dtype=np.int64)
+    total_corrections = np.zeros(MAX_CORRECTION_RADIUS + 1, dtype=np.int64)
+
+    total_uncorrected = 0
     max_r_observed = 0
 
+    # The compiled kernel processes one decay interval per call; progress
+    # reporting and the interval arrays stay out here in Python.
     start_index = MAX_CORRECTION_RADIUS + 1
-    for i in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1):
-        
-        # --- Standard Progress Tracker ---
-        if i % DECAY_ANALYSIS_INTERVAL == 0:
+    interval_start = start_index
+    last_progress = time.monotonic()
+    while interval_start <= MAX_PRIME_PAIRS_TO_TEST:
+        interval_end = (interval_start // DECAY_ANALYSIS_INTERVAL + 1) * DECAY_ANALYSIS_INTERVAL
+        interval_end = min(interval_end, MAX_PRIME_PAIRS_TO_TEST + 1)
+
+        corrections, exceptions, uncorrected, fail_i, fail_q, fail_k = scan_interval(
+            anchors, is_prime, interval_start, interval_end, MAX_CORRECTION_RADIUS)
+
+        bin_idx = interval_start // DECAY_ANALYSIS_INTERVAL
+        interval_r1[bin_idx] += corrections[1]
+        if MAX_CORRECTION_RADIUS >= 2:
+            interval_r2[bin_idx] += corrections[2]
+        interval_exceptions[bin_idx] += exceptions
+        total_corrections += corrections
+        hit_radii = np.flatnonzero(corrections)
+        if hit_radii.size > 0 and hit_radii[-1] > max_r_observed:
+            max_r_observed = int(hit_radii[-1])
+
+        if uncorrected > 0:
+            total_uncorrected += int(uncorrected)
+            print(f"\nFATAL: {uncorrected} exception(s) in interval ending {interval_end:,} "
+                  f"exceeded the maximum correction radius. Stopping.")
+            print(f"  First failure: anchor S_{fail_i} = {int(anchors[fail_i]):,} | "
+                  f"prime_q = {int(fail_q):,} | composite_k = {int(fail_k)}")
+            break
+
+        # Throttle progress output to once a second; on fast runs the
+        # formatting and terminal writes otherwise dominate the driver loop.
+        now = time.monotonic()
+        if now - last_progress >= 1.0:
+            last_progress = now
             elapsed = time.time() - start_time
-            print(f"Progress: {i:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Max r: {max_r_observed} | Time: {elapsed:.0f}s", end='\r')
-            
-            # --- Store results for the completed interval ---
-            if interval_exceptions > 0:
-                decay_stats[i] = {
-                    'exceptions': interval_exceptions,
-                    'corrections': interval_corrections.copy()
-                }
-            # --- Reset counters for the next interval ---
-            interval_exceptions = 0
-            interval_corrections.clear()
-
-        p_n = prime_list[i]
-        p_n_plus_1 = prime_list[i+1]
-        anchor_sum = p_n + p_n_plus_1
-
-        min_distance_k = 0
-        search_dist = 1
-        while True:
-            if (anchor_sum - search_dist) in prime_set or (anchor_sum + search_dist) in prime_set:
-                min_distance_k = search_dist
-                break
-            search_dist += 1
-        
-        is_k_composite = (min_distance_k > 1) and (min_distance_k not in prime_set)
-        
-        if is_k_composite:
-            interval_exceptions += 1 # Increment interval exception counter
-            
-            q_prime = 0
-            if (anchor_sum - min_distance_k) in prime_set: q_prime = anchor_sum - min_distance_k
-            else: q_prime = anchor_sum + min_distance_k
-            
-            is_corrected = False
-            for radius in range(1, MAX_CORRECTION_RADIUS + 1):
-                # (Correction logic is the same as before)
-                s_prev = prime_list[i - radius] + prime_list[i - radius + 1]
-                if abs(s_prev - q_prime) == 1 or abs(s_prev - q_prime) in prime_set: is_corrected = True
-                if not is_corrected:
-                    s_next = prime_list[i + radius] + prime_list[i + radius + 1]
-                    if abs(s_next - q_prime) == 1 or abs(s_next - q_prime) in prime_set: is_corrected = True
-
-                if is_corrected:
-                    # Update both total and interval stats
-                    total_successful_corrections[radius] = total_successful_corrections.get(radius, 0) + 1
-                    interval_corrections[radius] = interval_corrections.get(radius, 0) + 1
-                    if radius > max_r_observed: max_r_observed = radius
-                    break
-            
-            if not is_corrected:
-                correction_failures.append({"original_anchor": anchor_sum, "prime_q": q_prime, "composite_k": min_distance_k})
-                break
+            done = min(interval_end, MAX_PRIME_PAIRS_TO_TEST)
+            print(f"Progress: {done:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Max r: {max_r_observed} | Time: {elapsed:.0f}s", end='\r')
+        interval_start = interval_end
 
     print(f"Progress: {MAX_PRIME_PAIRS_TO_TEST:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Max r: {max_r_observed} | Time: {time.time() - start_time:.0f}s")
     print(f"\nAnalysis completed in {time.time() - start_time:.2f} seconds.")
@@ -134,13 +212,14 @@ def test_correction_law():
     cumulative_r2_total = 0
     cumulative_exceptions_total = 0
 
-    for interval_end, stats in decay_stats.items():
-        exceptions_count = stats['exceptions']
+    for bin_idx in range(num_intervals):
+        exceptions_count = int(interval_exceptions[bin_idx])
         if exceptions_count == 0: continue
 
-        r1_count = stats['corrections'].get(1, 0)
-        r2_count = stats['corrections'].get(2, 0)
-        
+        interval_end = (bin_idx + 1) * DECAY_ANALYSIS_INTERVAL
+        r1_count = int(interval_r1[bin_idx])
+        r2_count = int(interval_r2[bin_idx])
+
         cumulative_r1_total += r1_count
         cumulative_r2_total += r1_count + r2_count
         cumulative_exceptions_total += exceptions_count
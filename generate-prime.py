@@ -4,22 +4,16 @@
 import math
 import time
 
+import numpy as np
+
+from prime_sieve import sieve_of_eratosthenes
+
 # --- Configuration for Prime Generation ---
 TARGET_PRIMES = 100000000 + 1 + 101
 PRIME_LIST_PATH = "primes_100m.txt"
-
-def sieve_of_eratosthenes(limit):
-    """Generates primes up to 'limit' using the Sieve of Eratosthenes."""
-    limit = int(limit) 
-    if limit < 2:
-        return []
-    is_prime = [True] * (limit + 1)
-    is_prime[0] = is_prime[1] = False
-    for p in range(2, int(math.sqrt(limit)) + 1):
-        if is_prime[p]:
-            for multiple in range(p * p, limit + 1, p):
-                is_prime[multiple] = False
-    return [p for p, is_p in enumerate(is_prime) if is_p]
+PRIME_BIN_PATH = "primes_100m.bin"   # raw int64 blob, preferred by the analysis scripts
+SIEVE_BIN_PATH = "primes_100m.sieve" # value-indexed uint8 membership sieve, memmapped by analysis
+SIEVE_PADDING = 10000                # zero tail so probes past the last prime stay in bounds
 
 def get_first_n_primes(n):
     """Estimates a limit and generates the first n primes."""
@@ -40,13 +34,28 @@ def run_generator():
     if len(prime_list) != TARGET_PRIMES:
         print(f"WARNING: Could only find {len(prime_list)} primes. Target was {TARGET_PRIMES}.")
 
-    # Save to file
+    # Save the binary blob first: 8 bytes per prime, no parsing on reload
+    # (the analysis scripts load it with np.fromfile). The ASCII file is
+    # kept for inspection and for scripts that still read text.
+    prime_arr = np.asarray(prime_list, dtype=np.int64)
+    prime_arr.tofile(PRIME_BIN_PATH)
+
+    # Persist the membership sieve too, so analysis runs memmap it instead
+    # of rebuilding a multi-hundred-MB array from the prime list at startup.
+    is_prime = np.zeros(int(prime_arr[-1]) + SIEVE_PADDING, dtype=np.uint8)
+    is_prime[prime_arr] = 1
+    is_prime.tofile(SIEVE_BIN_PATH)
+    del is_prime
+
+    # Build the whole text image in memory and emit it with one write,
+    # instead of ~100M tiny f.write calls.
     with open(PRIME_LIST_PATH, 'w') as f:
-        for p in prime_list:
-            f.write(str(p) + '\n')
-            
+        f.write('\n'.join(map(str, prime_list)))
+        f.write('\n')
+
     print("-" * 50)
-    print(f"SUCCESS: Saved {len(prime_list):,} primes to {PRIME_LIST_PATH}")
+    print(f"SUCCESS: Saved {len(prime_list):,} primes to {PRIME_BIN_PATH} (binary)")
+    print(f"         and {PRIME_LIST_PATH} (text)")
     print(f"You can now run the analysis script.")
     print("-" * 50)
 
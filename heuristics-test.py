@@ -2,9 +2,40 @@
 # HEURISTIC ANALYSIS (The Fast, Analysis Step)
 # ==============================================================================
 
+import functools
 import math
+import os
 import time
-import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from prime_sieve import sieve_of_eratosthenes
+
+# Numba is optional: without it the kernels below run as interpreted Python
+# loops — slow under CPython, but a workable target for PyPy's JIT.
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def wrap(func):
+            return func
+        return wrap
+
+# Optional C sweep kernel (build once with: python build_anchor.py).
+# Used when Numba is absent; a dependency-light alternative to it.
+try:
+    from _anchor import ffi as _anchor_ffi, lib as _anchor_lib
+    C_KERNEL_AVAILABLE = True
+except ImportError:
+    C_KERNEL_AVAILABLE = False
 
 # --- Configuration (Must match File 1) ---
 INPUT_FILENAME = "primes_4m.txt" # This must be changed to "primes_4m.txt" to load the correct file
@@ -17,18 +48,21 @@ MAX_CORRECTION_RADIUS = 15
 # The prime 20,831,323 is close to this maximal stress point.
 STARTING_PRIME_VALUE = 20831323 
 CHECK_PAIRS = 20 # Number of prime pairs to check around the max gap location.
-PROGRESS_INTERVAL = 100000 # Update progress every 100,000 pairs
+PROGRESS_INTERVAL = 1000000 # Update progress every 1,000,000 pairs
 
 # --- Utility Functions ---
 
 def load_primes_from_file(filename):
-    """Loads primes efficiently from the generated file, and truncates the list."""
+    """Loads primes as an int64 ndarray, and truncates the list."""
     print(f"Loading primes from {filename}...")
     start_time = time.time()
-    
-    with open(filename, 'r') as f:
-        prime_list = [int(line.strip()) for line in f if line.strip()]
-        
+
+    # One whitespace-split parse straight into a contiguous int64 buffer:
+    # no per-line int() calls, and the array feeds the compiled kernels
+    # downstream without conversion.
+    with open(filename, 'rb') as f:
+        prime_list = np.array(f.read().split(), dtype=np.int64)
+
     end_time = time.time()
     print(f"Loaded {len(prime_list):,} total primes in {end_time - start_time:.2f} seconds.")
 
@@ -44,54 +78,266 @@ def load_primes_from_file(filename):
 
     return prime_list
 
+@functools.lru_cache(maxsize=None)
 def sieve_up_to_r(limit):
     """Generates primes up to a small R_max limit for P_Expected calculation."""
-    limit = int(limit)
-    if limit < 2: return []
-    is_prime = [True] * (limit + 1)
-    is_prime[0] = is_prime[1] = False
-    
-    for p in range(2, limit + 1):
-        if is_prime[p]:
-            for multiple in range(p*p, limit + 1, p):
-                is_prime[multiple] = False
-                
-    return [p for p, is_p in enumerate(is_prime) if is_p]
+    return sieve_of_eratosthenes(int(limit))
+
+CACHE_DIR = os.path.expanduser("~/.cache/prime_anchor")
+
+def get_odd_prime_bits(prime_arr, sieve_size):
+    """Packed odd-only sieve for the sweep, cached on disk keyed by its
+    inputs.
+
+    Cold path: scatter the primes into a dense uint8 sieve and pack the
+    odd entries (bit j stands for 2j+1). The bitmap depends only on the
+    loaded prime list and the probe range, so repeat runs and parameter
+    sweeps over the same prime file skip that work and memory-map the
+    cached copy instead — copy-on-write, so the compiled kernels still
+    see a writable buffer while the pages stay shared with the page
+    cache.
+    """
+    cache_path = os.path.join(
+        CACHE_DIR,
+        f"odd_bits_{prime_arr.size}_{int(prime_arr[-1])}_{sieve_size}.npy")
+    if os.path.exists(cache_path):
+        print(f"Memory-mapping cached prime bitmap from {cache_path}...")
+        return np.load(cache_path, mmap_mode='c')
+
+    is_prime = np.zeros(sieve_size, dtype=np.uint8)
+    is_prime[prime_arr] = 1
+    odd_bits = np.packbits(is_prime[1::2], bitorder='little')
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    np.save(cache_path, odd_bits)
+    return odd_bits
 
 # --- Core Analysis Logic ---
 
-def find_correction_radius(p_list, p_set, anchor_index, max_r):
-    """Performs Law I & Law III check for a single Anchor Point (used for defense)."""
-    
+@njit("int64(uint8[::1], int64)", cache=True)
+def odd_prime_bit(odd_bits, x):
+    """Membership probe for odd x against the bit-packed odd-number sieve
+    (bit j of the bitmap stands for the number 2j+1)."""
+    j = x >> 1
+    return (odd_bits[j >> 3] >> (j & 7)) & 1
+
+# Fine-scan horizon: primes are dense enough that almost every anchor
+# resolves within this distance; only the stragglers fall through to the
+# byte-granular widening scan.
+FINE_SCAN_LIMIT = 15
+
+@njit("int64(uint8[::1], int64, int64)", cache=True)
+def nearest_odd_distance(odd_bits, s, limit):
+    """Distance from even s to the nearest prime, or 0 if none within limit.
+
+    Every s tested here is even, so only odd distances can reach a prime
+    (the even prime 2 is never the nearest neighbor in this range) and d
+    steps by 2. When s is a multiple of 6 the wheel tightens further:
+    s +/- d is divisible by 3 whenever d is, and the only such prime (3
+    itself) is never the nearest neighbor here, so d skips 3, 9, 15, ...
+    by alternating steps of 4 and 2 — a third fewer probes. Probes hit
+    the packed odd-only bitmap — 1 bit per odd number, 16x smaller than
+    the uint8 sieve, so the working set stays cache-resident. The bitmap
+    is padded past the largest reachable probe (see
+    run_heuristic_analysis), so probes index it unconditionally.
+
+    Past the fine horizon the scan widens a whole bitmap byte (16
+    integers) per step instead of one distance per step: for control
+    values that land beyond the sieved range and must exhaust the full
+    search limit, that is 8x fewer memory touches.
+    """
+    d = 1
+    fine = FINE_SCAN_LIMIT if limit > FINE_SCAN_LIMIT else limit
+    if s % 6 == 0:
+        step = 4
+        while d <= fine:
+            if odd_prime_bit(odd_bits, s - d) or odd_prime_bit(odd_bits, s + d):
+                return d
+            d += step
+            step = 6 - step
+    else:
+        while d <= fine:
+            if odd_prime_bit(odd_bits, s - d) or odd_prime_bit(odd_bits, s + d):
+                return d
+            d += 2
+    if fine == limit:
+        return 0
+
+    # Byte-granular widening scan. Bit j of the bitmap is the number 2j+1;
+    # a set bit below the center c = s >> 1 means distance 2*(c-j)-1, one
+    # at or above it distance 2*(j-c)+1. Walk byte pairs outward, keeping
+    # the best hit, until no farther byte could beat it.
+    c = s >> 1
+    cb = c >> 3
+    best = limit + 1
+    m = 1
+    while True:
+        lower_min_d = 2 * (c - ((cb - m) * 8 + 7)) - 1
+        upper_min_d = 2 * ((cb + m) * 8 - c) + 1
+        reach = min(lower_min_d, upper_min_d)
+        if reach >= best or reach > limit:
+            break
+        b = odd_bits[cb - m]
+        if b != 0 and lower_min_d < best:
+            for bit in range(7, -1, -1):
+                if (b >> bit) & 1:
+                    dd = 2 * (c - ((cb - m) * 8 + bit)) - 1
+                    if dd < best:
+                        best = dd
+                    break
+        b = odd_bits[cb + m]
+        if b != 0 and upper_min_d < best:
+            for bit in range(8):
+                if (b >> bit) & 1:
+                    dd = 2 * (((cb + m) * 8 + bit) - c) + 1
+                    if dd < best:
+                        best = dd
+                    break
+        m += 1
+    if best <= limit:
+        return best
+    return 0
+
+@njit("int64(int64, uint8[::1], int64)", cache=True)
+def is_clean_anchor(s, odd_bits, limit):
+    """Returns 1 if the nearest-prime distance k_min of even s is clean
+    (1 or prime), else 0."""
+    k_min = nearest_odd_distance(odd_bits, s, limit)
+    if k_min == 1 or (k_min > 1 and odd_prime_bit(odd_bits, k_min)):
+        return 1
+    return 0
+
+@njit("UniTuple(int64, 3)(int64[::1], int64[::1], int64[::1], uint8[::1], int64)",
+      cache=True, parallel=True)
+def sweep_kernel(s_true, s_even, s_mod6, odd_bits, limit):
+    """Fused Law I sweep over all three anchor populations, compiled by Numba.
+
+    One prange pass handles the TRUE anchor, random-even and random-mod6
+    values for each index together: a third of the array traversals of three
+    separate sweeps, and the three probe windows for one index sit close
+    enough in the sieve to share cache. The random draws happen before the
+    call, so iterations are independent and the three counts are plain sum
+    reductions.
+    """
+    clean_true = 0
+    clean_even = 0
+    clean_mod6 = 0
+    for j in prange(s_true.size):
+        clean_true += is_clean_anchor(s_true[j], odd_bits, limit)
+        clean_even += is_clean_anchor(s_even[j], odd_bits, limit)
+        clean_mod6 += is_clean_anchor(s_mod6[j], odd_bits, limit)
+    return clean_true, clean_even, clean_mod6
+
+def sweep_c_kernel(s_true, s_even, s_mod6, odd_bits, limit):
+    """Fused sweep through the _anchor C extension (see anchor_kernel.c);
+    the arrays are handed over as zero-copy cffi buffer views."""
+    out = np.zeros(3, dtype=np.int64)
+    _anchor_lib.anchor_sweep(
+        _anchor_ffi.from_buffer("int64_t[]", s_true),
+        _anchor_ffi.from_buffer("int64_t[]", s_even),
+        _anchor_ffi.from_buffer("int64_t[]", s_mod6),
+        s_true.size,
+        _anchor_ffi.from_buffer("uint8_t[]", odd_bits),
+        limit,
+        _anchor_ffi.from_buffer("int64_t[]", out))
+    return int(out[0]), int(out[1]), int(out[2])
+
+def _sweep_worker(args):
+    """One worker of the no-Numba multiprocess sweep: attaches the shared
+    blocks by name and sweeps a half-open index range [lo, hi)."""
+    bits_name, bits_size, s_name, n, lo, hi, limit = args
+    shm_bits = shared_memory.SharedMemory(name=bits_name)
+    shm_s = shared_memory.SharedMemory(name=s_name)
+    try:
+        odd_bits = np.ndarray(bits_size, dtype=np.uint8, buffer=shm_bits.buf)
+        s_all = np.ndarray((3, n), dtype=np.int64, buffer=shm_s.buf)
+        clean_true = 0
+        clean_even = 0
+        clean_mod6 = 0
+        for j in range(lo, hi):
+            clean_true += is_clean_anchor(s_all[0, j], odd_bits, limit)
+            clean_even += is_clean_anchor(s_all[1, j], odd_bits, limit)
+            clean_mod6 += is_clean_anchor(s_all[2, j], odd_bits, limit)
+        result = (clean_true, clean_even, clean_mod6)
+        del odd_bits, s_all
+        return result
+    finally:
+        shm_bits.close()
+        shm_s.close()
+
+def sweep_multiprocess(s_true, s_even, s_mod6, odd_bits, limit):
+    """Fused sweep across worker processes for the no-Numba path.
+
+    The bitmap and the three s vectors live in shared_memory blocks, so
+    workers attach zero-copy views instead of unpickling hundreds of MB;
+    only block names and index ranges cross the process boundary.
+    """
+    n = s_true.size
+    shm_bits = shared_memory.SharedMemory(create=True, size=odd_bits.nbytes)
+    shm_s = shared_memory.SharedMemory(create=True, size=3 * n * 8)
+    try:
+        np.ndarray(odd_bits.size, dtype=np.uint8, buffer=shm_bits.buf)[:] = odd_bits
+        s_all = np.ndarray((3, n), dtype=np.int64, buffer=shm_s.buf)
+        s_all[0] = s_true
+        s_all[1] = s_even
+        s_all[2] = s_mod6
+        del s_all
+
+        workers = os.cpu_count() or 1
+        chunk = (n + workers - 1) // workers
+        tasks = [(shm_bits.name, odd_bits.size, shm_s.name, n,
+                  lo, min(lo + chunk, n), limit)
+                 for lo in range(0, n, chunk)]
+        clean_true = 0
+        clean_even = 0
+        clean_mod6 = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for ct, ce, cm in pool.map(_sweep_worker, tasks):
+                clean_true += ct
+                clean_even += ce
+                clean_mod6 += cm
+        return clean_true, clean_even, clean_mod6
+    finally:
+        shm_bits.close()
+        shm_bits.unlink()
+        shm_s.close()
+        shm_s.unlink()
+
+def find_correction_radius(p_list, S, is_prime, anchor_index, max_r):
+    """Performs Law I & Law III check for a single Anchor Point (used for defense).
+
+    S is the precomputed anchor-sum vector S[i] = p_i + p_{i+1}; consecutive
+    calls share it instead of re-adding prime pairs for every radius.
+    """
+
     p_n = p_list[anchor_index]
     p_n_plus_1 = p_list[anchor_index + 1]
-    anchor_sum = p_n + p_n_plus_1
-    
+    anchor_sum = S[anchor_index]
+
     # 1. Find Closest Prime (q_closest) and k_min
     k_min = 0
-    q_closest = 0 
+    q_closest = 0
     d = 1
-    
+
     while True:
         found_lower = (anchor_sum - d)
         found_upper = (anchor_sum + d)
-        
-        if found_lower in p_set:
+
+        if 0 <= found_lower < is_prime.size and is_prime[found_lower]:
             k_min = d
             q_closest = found_lower
             break
-        
-        if found_upper in p_set:
+
+        if found_upper < is_prime.size and is_prime[found_upper]:
             k_min = d
             q_closest = found_upper
             break
-        
+
         # Safety break if search goes too deep (should not happen in this range)
         if d > PRIME_SEARCH_SAFETY_LIMIT: return {"k": 0, "r": 0, "gap": p_n_plus_1 - p_n, "status": "FAIL: Too far"}
         d += 1
 
     # Check Law I Result
-    is_k_composite = (k_min > 1) and (k_min not in p_set)
+    is_k_composite = (k_min > 1) and (not is_prime[k_min])
     gap = p_n_plus_1 - p_n
 
     if not is_k_composite:
@@ -99,39 +345,38 @@ def find_correction_radius(p_list, p_set, anchor_index, max_r):
 
     # 2. Law III Correction Check (Only invoked if k is composite)
     target_prime = q_closest
-    
-    for radius in range(1, max_r + 1):
-        
+
+    # The index bounds are invariant across the radius loop, so clamp the
+    # radius range once instead of re-testing both sides on every step.
+    max_r_safe = min(max_r, anchor_index - 1, len(p_list) - anchor_index - 2)
+
+    for radius in range(1, max_r_safe + 1):
+
         # Check previous anchor (S_{n-r})
         idx_prev = anchor_index - radius
-        if idx_prev >= 1: 
-            s_prev = p_list[idx_prev] + p_list[idx_prev + 1]
-            k_prev = abs(s_prev - target_prime) 
-            if k_prev == 1 or k_prev in p_set:
-                return {"k": k_min, "r": radius, "gap": gap, "status": f"CORRECTED by S_n-{radius}"}
-        
+        k_prev = abs(S[idx_prev] - target_prime)
+        if k_prev == 1 or (k_prev < is_prime.size and is_prime[k_prev]):
+            return {"k": k_min, "r": radius, "gap": gap, "status": f"CORRECTED by S_n-{radius}"}
+
         # Check next anchor (S_{n+r})
         idx_next = anchor_index + radius
-        if idx_next + 1 < len(p_list):
-            s_next = p_list[idx_next] + p_list[idx_next + 1]
-            k_next = abs(s_next - target_prime) 
-            if k_next == 1 or k_next in p_set:
-                return {"k": k_min, "r": radius, "gap": gap, "status": f"CORRECTED by S_n+{radius}"}
+        k_next = abs(S[idx_next] - target_prime)
+        if k_next == 1 or (k_next < is_prime.size and is_prime[k_next]):
+            return {"k": k_min, "r": radius, "gap": gap, "status": f"CORRECTED by S_n+{radius}"}
     
     # 3. Law III Failure
     return {"k": k_min, "r": max_r, "gap": gap, "status": "FAILURE: Max Radius Exceeded"}
 
 
-def run_density_invariance_check(p_list, p_set):
+def run_density_invariance_check(p_list, is_prime):
     """Performs Defense 1: Checks Anchor Points near the largest prime gap."""
     
-    # Find the starting index near the maximal gap value
-    start_index = 0
-    for i, p in enumerate(p_list):
-        if p >= STARTING_PRIME_VALUE:
-            start_index = i
-            break
-            
+    # Find the starting index near the maximal gap value: the list is
+    # sorted, so one binary search replaces the linear scan.
+    start_index = int(np.searchsorted(np.asarray(p_list), STARTING_PRIME_VALUE, side='left'))
+    if start_index >= len(p_list):
+        start_index = 0  # value beyond the list; fall through to the warning
+
     if start_index == 0:
         print("\n[Defense 1 Warning]: Could not find the large gap starting prime in the list.")
         return
@@ -144,13 +389,17 @@ def run_density_invariance_check(p_list, p_set):
     print("-" * 80)
 
     max_r_found = 0
-    
+
+    # Anchor sums for the whole list, shared across the per-pair calls.
+    p_arr = np.asarray(p_list, dtype=np.int64)
+    S = p_arr[:-1] + p_arr[1:]
+
     # Iterate through the pairs immediately following the large gap location
     for i in range(start_index, start_index + CHECK_PAIRS):
         if i + 1 >= len(p_list): break
-        
+
         p_n = p_list[i]
-        result = find_correction_radius(p_list, p_set, i, MAX_CORRECTION_RADIUS)
+        result = find_correction_radius(p_list, S, is_prime, i, MAX_CORRECTION_RADIUS)
         
         if result['status'] == "FAIL: Too far": continue
 
@@ -173,99 +422,101 @@ def run_heuristic_analysis():
     """
     
     all_primes = load_primes_from_file(INPUT_FILENAME)
-    prime_set = set(all_primes)
     NUM_ANCHOR_POINTS_TO_TEST = len(all_primes) - 2
 
     if len(all_primes) < 2:
         print("Error: Not enough primes loaded.")
         return
 
+    prime_arr = np.asarray(all_primes, dtype=np.int64)
+
+    # Anchor sums S[i] = p_i + p_{i+1}, one vector add up front; every loop
+    # below just indexes this array instead of re-adding prime pairs.
+    S = prime_arr[:-1] + prime_arr[1:]
+
+    # Size the sieve past the largest possible probe: control anchors reach
+    # 1.1x the largest anchor sum, plus the full search limit (with slack
+    # for the byte-granular widening scan). The zero tail behaves exactly
+    # like a failed membership test, so the sweep kernel needs no per-probe
+    # bounds checks. Bit j of the packed bitmap stands for the odd number
+    # 2j+1, shrinking the probe table 16x so it fits in cache; the packed
+    # form is cached on disk across runs.
+    sieve_size = int(S[-1] * 1.1) + PRIME_SEARCH_SAFETY_LIMIT + 34
+    odd_bits = get_odd_prime_bits(prime_arr, sieve_size)
+
+
     # ==========================================================================
     # --- Part 1: Empirical Test (P_Observed using TRUE Anchors) ---
     # ==========================================================================
     print(f"\nStarting primary loop over {NUM_ANCHOR_POINTS_TO_TEST:,} TRUE Anchor Points...")
     primary_loop_start_time = time.time()
-    clean_k_count_observed = 0
 
-    for i in range(1, NUM_ANCHOR_POINTS_TO_TEST + 1):
-        if i % PROGRESS_INTERVAL == 0:
-            print(f"PROGRESS (True Anchors): {i:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed", end='\r', flush=True)
-
-        s_n = all_primes[i] + all_primes[i+1]
-        k_min = 0
-        search_radius = 1
-        
-        while search_radius <= PRIME_SEARCH_SAFETY_LIMIT:
-            if ((s_n - search_radius) in prime_set) or ((s_n + search_radius) in prime_set):
-                k_min = search_radius
-                break
-            search_radius += 1
-        if (k_min == 1) or (k_min > 1 and k_min in prime_set):
-            clean_k_count_observed += 1
-    
-    print(f"PROGRESS (True Anchors): {NUM_ANCHOR_POINTS_TO_TEST:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed. Complete.     ")
-    p_observed = clean_k_count_observed / NUM_ANCHOR_POINTS_TO_TEST
+    s_true = S[1:NUM_ANCHOR_POINTS_TO_TEST + 1]
     
     # ==========================================================================
     # --- Part 2: Control Test (P'_Baseline using RANDOM EVEN Anchors) ---
     # ==========================================================================
     print(f"\nStarting control loop over {NUM_ANCHOR_POINTS_TO_TEST:,} RANDOM EVEN Anchors...")
-    clean_k_count_control = 0
-    
-    for i in range(1, NUM_ANCHOR_POINTS_TO_TEST + 1):
-        if i % PROGRESS_INTERVAL == 0:
-            print(f"PROGRESS (Random Evens): {i:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed", end='\r', flush=True)
-        s_n_magnitude = all_primes[i] + all_primes[i+1]
-        lower_bound = int(s_n_magnitude * 0.9)
-        upper_bound = int(s_n_magnitude * 1.1)
-        random_num = random.randint(lower_bound, upper_bound)
-        s_control = random_num if random_num % 2 == 0 else random_num + 1
-
-        k_min = 0
-        search_radius = 1
-        
-        while search_radius <= PRIME_SEARCH_SAFETY_LIMIT:
-            q_lower = s_control - search_radius
-            if (q_lower > 1 and q_lower in prime_set) or ((s_control + search_radius) in prime_set):
-                k_min = search_radius
-                break
-            search_radius += 1
-        if (k_min == 1) or (k_min > 1 and k_min in prime_set):
-            clean_k_count_control += 1
 
+    # One vectorized PCG64 call per control population replaces millions of
+    # Python-level random.randint calls; the per-anchor magnitude bounds
+    # become two array ops on the anchor-sum vector.
+    rng = np.random.default_rng()
+    lower_bounds = s_true * 9 // 10
+    upper_bounds = s_true * 11 // 10
+
+    draws = rng.integers(lower_bounds, upper_bounds, endpoint=True)
+    s_control = draws + (draws & 1)  # round odd draws up to the next even
     print(f"PROGRESS (Random Evens): {NUM_ANCHOR_POINTS_TO_TEST:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed. Complete.    ")
-    p_baseline_control = clean_k_count_control / NUM_ANCHOR_POINTS_TO_TEST
 
     # ==========================================================================
     # --- Part 3: MODULO 6 Control Test (P''_Mod6_Baseline) ---
     # ==========================================================================
     print(f"\nStarting MODULO 6 control loop over {NUM_ANCHOR_POINTS_TO_TEST:,} RANDOM MULTIPLES OF 6...")
-    clean_k_count_mod6 = 0
-
-    for i in range(1, NUM_ANCHOR_POINTS_TO_TEST + 1):
-        if i % PROGRESS_INTERVAL == 0:
-            print(f"PROGRESS (Random Mod6): {i:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed", end='\r', flush=True)
-        s_n_magnitude = all_primes[i] + all_primes[i+1]
-        lower_bound = int(s_n_magnitude * 0.9)
-        upper_bound = int(s_n_magnitude * 1.1)
-        
-        random_num = random.randint(lower_bound, upper_bound)
-        s_control_mod6 = random_num - (random_num % 6)
 
-        k_min = 0
-        search_radius = 1
-        
-        while search_radius <= PRIME_SEARCH_SAFETY_LIMIT:
-            q_lower = s_control_mod6 - search_radius
-            if (q_lower > 1 and q_lower in prime_set) or ((s_control_mod6 + search_radius) in prime_set):
-                k_min = search_radius
-                break
-            search_radius += 1
-        if (k_min == 1) or (k_min > 1 and k_min in prime_set):
-            clean_k_count_mod6 += 1
-            
+    draws = rng.integers(lower_bounds, upper_bounds, endpoint=True)
+    s_control_mod6 = draws - (draws % 6)
     print(f"PROGRESS (Random Mod6): {NUM_ANCHOR_POINTS_TO_TEST:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed. Complete.     ")
-    p_baseline_mod6 = clean_k_count_mod6 / NUM_ANCHOR_POINTS_TO_TEST
+
+    # --- Fused sweep: all three populations, one compiled chunk at a time ---
+    # The kernel contains no progress or modulo logic; the driver hands it
+    # PROGRESS_INTERVAL anchors per call and prints between calls.
+    print(f"\nRunning fused sweep over all {3 * NUM_ANCHOR_POINTS_TO_TEST:,} anchor values...")
+    clean_true = 0
+    clean_even = 0
+    clean_mod6 = 0
+    if NUMBA_AVAILABLE:
+        for chunk_start in range(0, NUM_ANCHOR_POINTS_TO_TEST, PROGRESS_INTERVAL):
+            chunk_end = min(chunk_start + PROGRESS_INTERVAL, NUM_ANCHOR_POINTS_TO_TEST)
+            ct, ce, cm = sweep_kernel(s_true[chunk_start:chunk_end],
+                                      s_control[chunk_start:chunk_end],
+                                      s_control_mod6[chunk_start:chunk_end],
+                                      odd_bits, PRIME_SEARCH_SAFETY_LIMIT)
+            clean_true += ct
+            clean_even += ce
+            clean_mod6 += cm
+            print(f"PROGRESS (Fused Sweep): {chunk_end:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed", end='\r')
+    elif C_KERNEL_AVAILABLE:
+        for chunk_start in range(0, NUM_ANCHOR_POINTS_TO_TEST, PROGRESS_INTERVAL):
+            chunk_end = min(chunk_start + PROGRESS_INTERVAL, NUM_ANCHOR_POINTS_TO_TEST)
+            ct, ce, cm = sweep_c_kernel(s_true[chunk_start:chunk_end],
+                                        s_control[chunk_start:chunk_end],
+                                        s_control_mod6[chunk_start:chunk_end],
+                                        odd_bits, PRIME_SEARCH_SAFETY_LIMIT)
+            clean_true += ct
+            clean_even += ce
+            clean_mod6 += cm
+            print(f"PROGRESS (Fused Sweep): {chunk_end:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed", end='\r')
+    else:
+        # Interpreted fallback: spread the sweep across processes, sharing
+        # the bitmap and s vectors through shared memory.
+        clean_true, clean_even, clean_mod6 = sweep_multiprocess(
+            s_true, s_control, s_control_mod6, odd_bits, PRIME_SEARCH_SAFETY_LIMIT)
+    print(f"PROGRESS (Fused Sweep): {NUM_ANCHOR_POINTS_TO_TEST:,} / {NUM_ANCHOR_POINTS_TO_TEST:,} processed. Complete.   ")
+
+    p_observed = clean_true / NUM_ANCHOR_POINTS_TO_TEST
+    p_baseline_control = clean_even / NUM_ANCHOR_POINTS_TO_TEST
+    p_baseline_mod6 = clean_mod6 / NUM_ANCHOR_POINTS_TO_TEST
 
     # ==========================================================================
     # --- Part 4: Final Analysis & Definitive Comparison ---
@@ -15,26 +15,73 @@
 
 import math
 import time
-from collections import defaultdict
 
-# --- Configuration ---
-PRIME_INPUT_FILE = "primes_100m.txt" 
-MAX_PRIME_PAIRS_TO_TEST = 4000000      
+import numpy as np
 
-# --- Function to load primes from a file ---
-def load_primes_from_file(filename):
-    """Loads a list of primes from a text file."""
-    print(f"Loading primes from {filename}...")
-    start_time = time.time()
-    try:
-        with open(filename, 'r') as f:
-            prime_list = [int(line.strip()) for line in f]
-    except FileNotFoundError:
-        print(f"FATAL ERROR: The prime file '{filename}' was not found.")
-        return None
-    end_time = time.time()
-    print(f"Loaded {len(prime_list):,} primes in {end_time - start_time:.2f} seconds.")
-    return prime_list
+from prime_sieve import load_primes_from_file
+
+# --- Configuration ---
+PRIME_INPUT_FILE = "primes_100m.txt"
+MAX_PRIME_PAIRS_TO_TEST = 4000000
+CHUNK_SIZE = 65536                   # Anchors per vectorized block
+MAX_SEARCH_K = 1000                  # Safety cap on k, from the old outward scan
+
+# Anchor residue -> row of the failure-count array. S_n % 6 can't be 1, 3
+# or 5 (sum of two odd primes > 3), so those residues map to no row.
+MOD6_ROW = np.array([0, -1, 1, -1, 2, -1], dtype=np.int8)
+
+def build_odd_prime_bits(prime_list, limit):
+    """Packs the odd primes into a bitmap where bit j stands for 2j+1.
+
+    One bit per odd integer up to 'limit' — ~limit/16 bytes, against ~40
+    bytes per entry for a Python set over the same primes — so membership
+    probes become a shift-and-mask against a buffer small enough to stay
+    cache-resident. The zero tail past the last prime behaves exactly like
+    a failed set probe. Even numbers need no bits: only odd values can be
+    prime in this range, and odd_prime_bit rejects even probes up front.
+    """
+    bits = np.zeros(((limit >> 1) >> 3) + 1, dtype=np.uint8)
+    odd = np.asarray(prime_list, dtype=np.int64)
+    odd = odd[odd > 2] >> 1
+    np.bitwise_or.at(bits, odd >> 3, (np.uint8(1) << (odd & 7).astype(np.uint8)))
+    return bits
+
+def odd_prime_bit(bits, x):
+    """Membership probe against the packed bitmap; even x (never prime in
+    this range) short-circuits without touching the buffer."""
+    if not x & 1:
+        return 0
+    j = x >> 1
+    return (bits[j >> 3] >> (j & 7)) & 1
+
+def build_nearest_prime_dist(prime_list, limit):
+    """Distance from every integer in [0, limit] to the nearest loaded prime.
+
+    Two accumulate sweeps over the value range — forward for the latest
+    prime at or below x, backward for the earliest at or above — replace
+    the per-anchor outward scan: each anchor's k_min becomes one int32
+    load instead of up to a thousand probes. Retains 4 bytes per value
+    (plus ~24 transient during the build), amortized across every anchor
+    in the run.
+    """
+    n = limit + 1
+    primes = np.asarray(prime_list, dtype=np.int64)
+    primes = primes[primes <= limit]
+
+    # Sentinels far outside the range make "no prime on this side" lose
+    # every np.minimum below, matching a failed outward probe.
+    marker = np.full(n, -2 * n, dtype=np.int64)
+    marker[primes] = primes
+    np.maximum.accumulate(marker, out=marker)
+    pos = np.arange(n, dtype=np.int64)
+    d_prev = pos - marker
+
+    marker = np.full(n, 3 * n, dtype=np.int64)
+    marker[primes] = primes
+    marker = np.minimum.accumulate(marker[::-1])[::-1]
+    d_next = marker - pos
+
+    return np.minimum(d_prev, d_next).astype(np.int32)
 
 # --- Main Testing Logic ---
 def run_mod6_classifier_test():
@@ -48,62 +95,63 @@ def run_mod6_classifier_test():
         print("\nFATAL ERROR: The loaded prime file is too small for this test.")
         return
 
-    print("\nSafety check passed. Creating prime set for fast lookups...")
-    prime_set = set(prime_list)
-    print("Prime set created. Starting analysis...")
+    # Sized past the largest possible probe: anchor sums plus the search cap.
+    print("\nSafety check passed. Packing prime bitmap for fast lookups...")
+    bit_limit = 2 * prime_list[-1] + 2048
+    prime_bits = build_odd_prime_bits(prime_list, bit_limit)
+    print("Prime bitmap packed. Building nearest-prime distance table...")
+
+    # Covers every anchor sum tested, with slack past the last anchor so
+    # the backward sweep still sees the next prime above it.
+    anchor_max = prime_list[MAX_PRIME_PAIRS_TO_TEST] + prime_list[MAX_PRIME_PAIRS_TO_TEST + 1]
+    nearest_dist = build_nearest_prime_dist(prime_list, anchor_max + 1002)
+    print("Distance table built. Starting analysis...")
 
     print(f"\nStarting Modulo 6 Classifier test for {MAX_PRIME_PAIRS_TO_TEST:,} pairs...")
     print("-" * 80)
     start_time = time.time()
     
     # --- Data structures for Test 2 ---
-    # We will store the *set* of unique k-values found for each bin
-    failure_bins = {
-        0: defaultdict(int), # S_n % 6 == 0
-        2: defaultdict(int), # S_n % 6 == 2
-        4: defaultdict(int)  # S_n % 6 == 4
-        # S_n % 6 can't be 1, 3, 5 (sum of two odd primes > 3)
-    }
+    # Failure counts per (anchor residue row, k): k is capped at
+    # MAX_SEARCH_K, so a fixed (3, 1001) int64 array replaces the nested
+    # dicts — each update is an indexed add instead of two hash probes.
+    failure_bins = np.zeros((3, MAX_SEARCH_K + 1), dtype=np.int64)
     
     total_failures = 0
     
     # Start at i=2 (S_3 = 5+7=12) since we know S_2 (i=1) never fails
     # and S_1 (i=0) is 2+3=5, which is also not part of the n>2 system.
-    start_index = 2 
-    
-    for i in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1):
-        if i % 100000 == 0:
-            elapsed = time.time() - start_time
-            print(f"Progress: {i:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Time: {elapsed:.0f}s", end='\r')
-
-        p_n = prime_list[i]
-        p_n_plus_1 = prime_list[i+1]
-        anchor_sum = p_n + p_n_plus_1
-
-        min_distance_k = 0
-        search_dist = 1
-        while True:
-            if search_dist > 1000: break # Safety break
-            
-            if (anchor_sum - search_dist) in prime_set or (anchor_sum + search_dist) in prime_set:
-                min_distance_k = search_dist
-                break
-            search_dist += 1
-        
-        if min_distance_k == 0: continue 
-
-        is_k_composite = (min_distance_k > 1) and (min_distance_k not in prime_set)
-        
-        if is_k_composite:
-            total_failures += 1
-            
-            # This is the core of Test 2:
-            # Classify the failure based on the anchor's mod 6 value
-            anchor_mod_6 = anchor_sum % 6
-            
-            # Log the frequency of this specific k-value in its bin
-            failure_bins[anchor_mod_6][min_distance_k] += 1
-            
+    start_index = 2
+
+    # Anchor sums for the whole run, one vector add up front.
+    S = prime_list[:-1] + prime_list[1:]
+
+    # Process anchors in cache-sized blocks: each block's sums, distances
+    # and masks are small contiguous arrays that stay resident across the
+    # handful of vector passes over them, and the distance-table gather
+    # walks the table in order. No per-anchor Python work survives.
+    for lo in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1, CHUNK_SIZE):
+        hi = min(lo + CHUNK_SIZE, MAX_PRIME_PAIRS_TO_TEST + 1)
+        anchor_sums = S[lo:hi]
+        k = nearest_dist[anchor_sums].astype(np.int64)
+
+        # Composite-k failures: k > 1, within the old scan cap, and k not
+        # prime — one gathered bitmap probe per anchor (k is always odd).
+        j = k >> 1
+        k_is_prime = (prime_bits[j >> 3] >> (j & 7)) & 1
+        comp = (k > 1) & (k <= MAX_SEARCH_K) & (k_is_prime == 0)
+        total_failures += int(np.count_nonzero(comp))
+
+        # This is the core of Test 2: classify each failure by the
+        # anchor's mod 6 value. Fold (row, k) into one flat index and let
+        # np.bincount do the counting — a branchless histogram pass,
+        # rather than np.add.at's per-element scattered updates.
+        rows = MOD6_ROW[anchor_sums[comp] % 6].astype(np.int64)
+        flat = rows * (MAX_SEARCH_K + 1) + k[comp]
+        failure_bins += np.bincount(flat, minlength=failure_bins.size).reshape(failure_bins.shape)
+
+        elapsed = time.time() - start_time
+        print(f"Progress: {hi - 1:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Time: {elapsed:.0f}s", end='\r')
 
     print(f"Progress: {MAX_PRIME_PAIRS_TO_TEST:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Time: {time.time() - start_time:.0f}s")
     print(f"\nAnalysis completed in {time.time() - start_time:.2f} seconds.")
@@ -115,9 +163,9 @@ def run_mod6_classifier_test():
 
     # --- Report for Bin 0 (S_n % 6 == 0) ---
     print("\n" + "-"*20 + " Failures from S_n % 6 == 0 " + "-"*20)
-    bin_0_composites = failure_bins[0].keys()
-    print(f"Total failures in this bin: {sum(failure_bins[0].values()):,}")
-    print(f"Unique composite k-values (Sample): {sorted(list(bin_0_composites))[:20]}")
+    bin_0_composites = np.flatnonzero(failure_bins[0]).tolist()
+    print(f"Total failures in this bin: {int(failure_bins[0].sum()):,}")
+    print(f"Unique composite k-values (Sample): {bin_0_composites[:20]}")
     
     mod_3_found_in_bin_0 = {k for k in bin_0_composites if k % 3 == 0}
     if not mod_3_found_in_bin_0:
@@ -128,9 +176,9 @@ def run_mod6_classifier_test():
 
     # --- Report for Bin 2 (S_n % 6 == 2) ---
     print("\n" + "-"*20 + " Failures from S_n % 6 == 2 " + "-"*20)
-    bin_2_composites = failure_bins[2].keys()
-    print(f"Total failures in this bin: {sum(failure_bins[2].values()):,}")
-    print(f"Unique composite k-values (Sample): {sorted(list(bin_2_composites))[:20]}")
+    bin_2_composites = np.flatnonzero(failure_bins[1]).tolist()
+    print(f"Total failures in this bin: {int(failure_bins[1].sum()):,}")
+    print(f"Unique composite k-values (Sample): {bin_2_composites[:20]}")
     
     non_mod_3_found_in_bin_2 = {k for k in bin_2_composites if k % 3 != 0}
     if not non_mod_3_found_in_bin_2:
@@ -140,9 +188,9 @@ def run_mod6_classifier_test():
 
     # --- Report for Bin 4 (S_n % 6 == 4) ---
     print("\n" + "-"*20 + " Failures from S_n % 6 == 4 " + "-"*20)
-    bin_4_composites = failure_bins[4].keys()
-    print(f"Total failures in this bin: {sum(failure_bins[4].values()):,}")
-    print(f"Unique composite k-values (Sample): {sorted(list(bin_4_composites))[:20]}")
+    bin_4_composites = np.flatnonzero(failure_bins[2]).tolist()
+    print(f"Total failures in this bin: {int(failure_bins[2].sum()):,}")
+    print(f"Unique composite k-values (Sample): {bin_4_composites[:20]}")
 
     non_mod_3_found_in_bin_4 = {k for k in bin_4_composites if k % 3 != 0}
     if not non_mod_3_found_in_bin_4:
@@ -6,30 +6,21 @@
 # structure for Laws I, II, and III.
 # ==============================================================================
 
+import collections
 import math
+import os
 import time
 
+import numpy as np
+
+from prime_sieve import load_primes_from_file
+
 # --- Configuration ---
 # -- Generate Prime sets first using generate-primes.py --
-PRIME_INPUT_FILE = "primes_100m.txt" 
+PRIME_INPUT_FILE = "primes_100m.txt"
 MAX_PRIME_PAIRS_TO_TEST = 50000000      # Set to your desired test limit
 MAX_CORRECTION_RADIUS = 20           # A safe radius for the test
-
-# --- Function to load primes from a file ---
-def load_primes_from_file(filename):
-    """Loads a list of primes from a text file."""
-    print(f"Loading primes from {filename}...")
-    start_time = time.time()
-    try:
-        with open(filename, 'r') as f:
-            prime_list = [int(line.strip()) for line in f]
-    except FileNotFoundError:
-        print(f"FATAL ERROR: The prime file '{filename}' was not found.")
-        print("Please run the 'generate-primes.py' script first.")
-        return None
-    end_time = time.time()
-    print(f"Loaded {len(prime_list):,} primes in {end_time - start_time:.2f} seconds.")
-    return prime_list
+BATCH_SIZE = 1000000                 # Anchors per vectorized Law I pass
 
 # --- Main Testing Logic ---
 def test_correction_law():
@@ -51,79 +42,133 @@ def test_correction_law():
         print("="*80)
         return
 
-    print("\nSafety check passed. Creating prime set for fast lookups...")
-    prime_set = set(prime_list)
-    print("Prime set created. Starting analysis...")
+    # A dense uint8 sieve turns every membership probe into a single indexed
+    # load from a contiguous buffer, instead of hashing a PyLong into a ~6GB
+    # Python set. The tail padding keeps anchor_sum + search_dist in bounds.
+    # generate-prime.py persists this sieve, so prefer memory-mapping it and
+    # let the page cache fault in only the bytes actually touched.
+    max_prime = prime_list[-1]
+    sieve_size = max_prime + MAX_CORRECTION_RADIUS * 300
+    sieve_path = os.path.splitext(PRIME_INPUT_FILE)[0] + '.sieve'
+    if os.path.exists(sieve_path) and os.path.getsize(sieve_path) >= sieve_size:
+        print(f"\nSafety check passed. Memory-mapping prime sieve from {sieve_path}...")
+        is_prime = np.memmap(sieve_path, dtype=np.uint8, mode='r')
+    else:
+        print("\nSafety check passed. Building prime bit-sieve for fast lookups...")
+        is_prime = np.zeros(sieve_size, dtype=np.uint8)
+        is_prime[prime_list] = 1
+    # Anchor sums S_n = p_n + p_{n+1}, computed once as a single vector add;
+    # the hot loop and the radius scan just index this array.
+    anchors = prime_list[:-1] + prime_list[1:]
+    print("Prime sieve built. Starting analysis...")
 
     print(f"\nStarting hierarchical test for the first {MAX_PRIME_PAIRS_TO_TEST:,} pairs...")
     print(f"Maximum correction radius set to: {MAX_CORRECTION_RADIUS}")
     print("-" * 80)
     start_time = time.time()
     
-    successful_corrections = []
+    # Only the count of corrections feeds the final report, so keep a
+    # counter plus a bounded sample of the first few (for interactive
+    # inspection) instead of a dict per correction — at 50M pairs the
+    # full list ran to hundreds of MB of dicts that were never printed.
+    successful_correction_count = 0
+    correction_samples = collections.deque(maxlen=50)
     correction_failures = []
-    counterexample_ks = set()
+    # Flag array over k instead of a Python set: marking a batch of
+    # counterexample k-values is one fancy-indexed store, and the sorted
+    # unique list falls out of flatnonzero at report time. 64K slots is
+    # far past any nearest-prime distance in range (the largest prime gap
+    # below 2^64 is under 1,600).
+    seen_k = np.zeros(1 << 16, dtype=np.uint8)
     max_r_observed = 0
-    correction_radius_counts = {}
+    # Radius is bounded by MAX_CORRECTION_RADIUS, so the distribution is
+    # a fixed-size array: one indexed increment per exception, no dict
+    # hashing or boxed-int churn in the per-exception path.
+    correction_radius_counts = np.zeros(MAX_CORRECTION_RADIUS + 1, dtype=np.int64)
 
     start_index = MAX_CORRECTION_RADIUS + 1
-    for i in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1):
-        if i % 100000 == 0:
-            elapsed = time.time() - start_time
-            print(f"Progress: {i:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Max r: {max_r_observed} | Time: {elapsed:.0f}s", end='\r')
-
-        p_n = prime_list[i]
-        p_n_plus_1 = prime_list[i+1]
-        anchor_sum = p_n + p_n_plus_1
-
-        min_distance_k = 0
-        search_dist = 1
-        while True:
-            if (anchor_sum - search_dist) in prime_set or (anchor_sum + search_dist) in prime_set:
-                min_distance_k = search_dist
-                break
-            search_dist += 1
-        
-        is_k_composite = (min_distance_k > 1) and (min_distance_k not in prime_set)
-        
-        if is_k_composite:
-            counterexample_ks.add(min_distance_k)
-            
-            q_prime = 0
-            if (anchor_sum - min_distance_k) in prime_set:
-                q_prime = anchor_sum - min_distance_k
-            else:
-                q_prime = anchor_sum + min_distance_k
-            
-            is_corrected = False
-            correction_details = {}
-            for radius in range(1, MAX_CORRECTION_RADIUS + 1):
-                s_prev = prime_list[i - radius] + prime_list[i - radius + 1]
-                k_prev = abs(s_prev - q_prime)
-                if k_prev == 1 or k_prev in prime_set:
-                    is_corrected = True
-                    correction_details = {"corrected_by": f"S_n-{radius}", "radius": radius, "new_k": k_prev}
-                
-                if not is_corrected:
-                    s_next = prime_list[i + radius] + prime_list[i + radius + 1]
-                    k_next = abs(s_next - q_prime)
-                    if k_next == 1 or k_next in prime_set:
-                        is_corrected = True
-                        correction_details = {"corrected_by": f"S_n+{radius}", "radius": radius, "new_k": k_next}
-
-                if is_corrected:
-                    base_info = {"original_anchor": anchor_sum, "prime_q": q_prime, "composite_k": min_distance_k}
-                    successful_corrections.append({**base_info, **correction_details})
-                    
+    last_progress = time.monotonic()
+    for batch_start in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1, BATCH_SIZE):
+        batch_end = min(batch_start + BATCH_SIZE, MAX_PRIME_PAIRS_TO_TEST + 1)
+        batch = anchors[batch_start:batch_end]
+
+        # --- Vectorized Law I pass over the whole batch ---
+        # Anchor sums are even, so they never equal a prime: the nearest
+        # primes bracket each anchor at positions pos-1 and pos, and the
+        # minimum distance falls out of one searchsorted per batch instead
+        # of a per-pair expanding scan.
+        pos = np.searchsorted(prime_list, batch)
+        below = batch - prime_list[pos - 1]
+        above = prime_list[pos] - batch
+        k_min = np.minimum(below, above)
+        # The closest prime itself; ties go to the lower side, matching the
+        # old scan order (anchor_sum - d was probed first).
+        q_near = np.where(below <= above, prime_list[pos - 1], prime_list[pos])
+
+        # Vector analog of an early continue on k=1: only the k>1 entries
+        # (a small minority) get the sieve gather for the compositeness test.
+        exception_offsets = np.flatnonzero(k_min > 1)
+        exception_offsets = exception_offsets[is_prime[k_min[exception_offsets]] == 0]
+
+        seen_k[k_min[exception_offsets]] = 1
+
+        # --- Vectorized Law III radius scan over the exceptions ---
+        # Gather the neighbor anchors S_{n-r} / S_{n+r} for every exception
+        # and every radius at once; a correction is a distance of 1 or a
+        # prime distance, checked with one fancy-index into the sieve. The
+        # lower-side anchor wins ties, matching the old scan order.
+        law_iii_broken = False
+        if exception_offsets.size > 0:
+            exc_idx = batch_start + exception_offsets
+            qs = q_near[exception_offsets]
+            radii = np.arange(1, MAX_CORRECTION_RADIUS + 1)
+            d_prev = np.abs(anchors[exc_idx[:, None] - radii] - qs[:, None])
+            d_next = np.abs(anchors[exc_idx[:, None] + radii] - qs[:, None])
+            hit_prev = (d_prev == 1) | (is_prime[d_prev] == 1)
+            hit_next = (d_next == 1) | (is_prime[d_next] == 1)
+            hit = hit_prev | hit_next
+            corrected = hit.any(axis=1)
+            first_col = hit.argmax(axis=1)
+
+            # Python only updates counters here; no probing happens, and
+            # the report dicts are built only for the bounded sample.
+            for row, offset in enumerate(exception_offsets):
+                if corrected[row]:
+                    col = int(first_col[row])
+                    radius = col + 1
+                    successful_correction_count += 1
+                    if len(correction_samples) < correction_samples.maxlen:
+                        if hit_prev[row, col]:
+                            corrected_by, new_k = f"S_n-{radius}", int(d_prev[row, col])
+                        else:
+                            corrected_by, new_k = f"S_n+{radius}", int(d_next[row, col])
+                        correction_samples.append({
+                            "original_anchor": int(batch[offset]),
+                            "prime_q": int(qs[row]),
+                            "composite_k": int(k_min[offset]),
+                            "corrected_by": corrected_by,
+                            "radius": radius, "new_k": new_k})
+
                     # Update stats for final report
-                    correction_radius_counts[radius] = correction_radius_counts.get(radius, 0) + 1
+                    correction_radius_counts[radius] += 1
                     if radius > max_r_observed:
                         max_r_observed = radius
+                else:
+                    correction_failures.append({"original_anchor": int(batch[offset]), "failed_prime_q": int(qs[row]), "composite_k": int(k_min[offset])})
+                    law_iii_broken = True
                     break
-            
-            if not is_corrected:
-                correction_failures.append({"original_anchor": anchor_sum, "failed_prime_q": q_prime, "composite_k": min_distance_k})
-                break
+
+        if law_iii_broken:
+            break
+
+        # Throttle progress output to once a second; on fast runs the
+        # formatting and terminal writes otherwise dominate the driver loop.
+        now = time.monotonic()
+        if now - last_progress >= 1.0:
+            last_progress = now
+            elapsed = time.time() - start_time
+            done = min(batch_end - 1, MAX_PRIME_PAIRS_TO_TEST)
+            print(f"Progress: {done:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Max r: {max_r_observed} | Time: {elapsed:.0f}s", end='\r')
 
     print(f"Progress: {MAX_PRIME_PAIRS_TO_TEST:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Max r: {max_r_observed} | Time: {time.time() - start_time:.0f}s")
     print(f"\nAnalysis completed in {time.time() - start_time:.2f} seconds.")
@@ -133,7 +178,7 @@ def test_correction_law():
     print("\n" + "="*20 + " FINAL ANALYSIS REPORT " + "="*20)
     if not correction_failures:
         print(f"\n[ STATUS: LAW III VERIFIED UP TO {MAX_PRIME_PAIRS_TO_TEST:,} PAIRS ]")
-        print(f"The system holds true. All {len(successful_corrections):,} exceptions were successfully corrected.")
+        print(f"The system holds true. All {successful_correction_count:,} exceptions were successfully corrected.")
         print(f"The maximum correction radius observed was: r_max = {max_r_observed}")
     else:
         print("\n[ STATUS: ANOMALY DETECTED - LAW III FALSIFIED ]")
@@ -141,14 +186,14 @@ def test_correction_law():
 
     print("\n" + "-"*20 + " Law II Report: Composite k-Values Found " + "-"*20)
     print("The unique composite k-values found in the exceptions were:")
-    print(sorted(list(counterexample_ks)))
+    print(np.flatnonzero(seen_k).tolist())
 
     print("\n" + "-"*20 + " Law III Report: Correction Radius Distribution " + "-"*20)
-    total_exceptions = sum(correction_radius_counts.values())
+    total_exceptions = int(correction_radius_counts.sum())
     print(f"{'Radius (r)':<12} | {'Corrections':<15} | {'Percentage'}")
     print("-" * 50)
-    for r in sorted(correction_radius_counts.keys()):
-        count = correction_radius_counts[r]
+    for r in np.flatnonzero(correction_radius_counts).tolist():
+        count = int(correction_radius_counts[r])
         percentage = (count / total_exceptions) * 100 if total_exceptions > 0 else 0
         print(f"{r:<12} | {count:<15,} | {percentage:.2f}%")
     print("-" * 50)
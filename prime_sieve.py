@@ -0,0 +1,137 @@
+# ==============================================================================
+# SHARED PRIME SIEVE AND LOADER
+#
+# One implementation of the segmented, odds-only sieve for every script
+# that needs to generate primes, and of the prime-file loader for every
+# script that reads generate-prime.py's output. The cross-off inner
+# loops are NumPy strided slice stores, which run as C-level memory
+# fills; keeping the module pure Python avoids a compile step for what
+# is already compiled work.
+# ==============================================================================
+import math
+import os
+import time
+
+import numpy as np
+
+# Odds per segment (~2MB of uint8): each segment stays cache-resident while
+# every base prime makes its cross-off pass over it, instead of streaming a
+# multi-GB array through DRAM once per base prime.
+SEGMENT_SIZE = 1 << 21
+
+# Odd entries per 2*3*5*7 = 210 span of integers. The cross-off pattern of
+# the base primes 3, 5 and 7 repeats with this period, so segments start
+# from a tiled copy of it (see sieve_of_eratosthenes) rather than running
+# the three densest strided passes — together 1/3 + 1/5 + 1/7 of all
+# entries — against every segment.
+WHEEL_PERIOD = 105
+
+def _small_odd_sieve(limit):
+    """Monolithic odds-only sieve; returns the odd primes up to 'limit'."""
+    half = (limit + 1) // 2
+    sieve = np.ones(half, dtype=np.uint8)
+    sieve[0] = 0  # 1 is not prime
+    # isqrt: exact integer root — no float rounding hazard near 2^53,
+    # unlike int(math.sqrt(...)).
+    for p in range(3, math.isqrt(limit) + 1, 2):
+        if sieve[p // 2]:
+            sieve[(p * p) // 2::p] = 0
+    return 2 * np.flatnonzero(sieve).astype(np.int64) + 1
+
+def sieve_of_eratosthenes(limit):
+    """Generates primes up to 'limit' using a segmented, odds-only sieve.
+
+    Entry k of a segment stands for the odd number 2k+1. Base primes up to
+    sqrt(limit) come from a small in-memory sieve; each segment is then
+    crossed off with strided slice stores and emitted before moving on.
+    """
+    limit = int(limit)
+    if limit < 2:
+        return np.empty(0, dtype=np.int64)
+    half = (limit + 1) // 2
+    root = math.isqrt(limit)
+    base_primes = _small_odd_sieve(root) if root >= 3 else np.empty(0, dtype=np.int64)
+
+    chunks = [np.array([2], dtype=np.int64)]
+
+    # Wheel template: entry k survives iff 2k+1 has no factor 3, 5 or 7.
+    # Tiled with one extra period so any segment offset can slice from it.
+    vals = 2 * np.arange(WHEEL_PERIOD, dtype=np.int64) + 1
+    template = ((vals % 3 != 0) & (vals % 5 != 0) & (vals % 7 != 0)).astype(np.uint8)
+    pattern = np.tile(template, min(SEGMENT_SIZE, half) // WHEEL_PERIOD + 2)
+
+    segment = np.ones(min(SEGMENT_SIZE, half), dtype=np.uint8)
+    for lo in range(0, half, SEGMENT_SIZE):
+        hi = min(lo + SEGMENT_SIZE, half)
+        seg = segment[:hi - lo]
+        off = lo % WHEEL_PERIOD
+        seg[:] = pattern[off:off + (hi - lo)]
+        if lo == 0:
+            seg[0] = 0      # 1 is not prime
+            seg[1:4] = 1    # 3, 5 and 7 themselves survive the wheel
+        # The wheel already covered 3, 5 and 7; cross off from 11 up.
+        for p in base_primes[3:]:
+            p = int(p)
+            # Index of p*p, then the first odd multiple of p inside [lo, hi).
+            start = (p * p) // 2
+            if start >= hi:
+                break  # base_primes is sorted, later primes start further out
+            if start < lo:
+                start += ((lo - start + p - 1) // p) * p
+            seg[start - lo::p] = 0
+        chunks.append(2 * (lo + np.flatnonzero(seg).astype(np.int64)) + 1)
+    return np.concatenate(chunks)
+
+def load_primes_from_file(filename):
+    """Loads primes as an int64 ndarray, preferring the binary sidecar file."""
+    bin_path = os.path.splitext(filename)[0] + '.bin'
+    start_time = time.time()
+    if os.path.exists(bin_path):
+        # Raw int64 blob written by generate-prime.py: one read, no parsing.
+        print(f"Loading primes from {bin_path}...")
+        prime_list = np.fromfile(bin_path, dtype=np.int64)
+    else:
+        print(f"Loading primes from {filename}...")
+        try:
+            # Stream the ~1GB ASCII file in 16MB chunks, carrying the
+            # trailing partial line between reads: whitespace-split parsing
+            # without holding the whole file plus its token list in memory.
+            chunks = []
+            with open(filename, 'rb') as f:
+                tail = b''
+                while True:
+                    block = f.read(16 << 20)
+                    if not block:
+                        break
+                    block = tail + block
+                    cut = block.rfind(b'\n')
+                    if cut < 0:
+                        tail = block
+                        continue
+                    tail = block[cut + 1:]
+                    chunks.append(np.array(block[:cut].split(), dtype=np.int64))
+                if tail.strip():
+                    chunks.append(np.array(tail.split(), dtype=np.int64))
+            prime_list = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+        except FileNotFoundError:
+            print(f"FATAL ERROR: The prime file '{filename}' was not found.")
+            print("Please run the 'generate-prime.py' script first.")
+            return None
+    end_time = time.time()
+    print(f"Loaded {len(prime_list):,} primes in {end_time - start_time:.2f} seconds.")
+    return prime_list
+
+def prime_to_index(prime_arr, values):
+    """Index of each value in the sorted prime array; -1 where absent.
+
+    O(log N) bisection per lookup against the array that is already in
+    memory — use this instead of prime_arr.tolist().index(...) (O(N) per
+    call) or a value->index dict (~40 bytes per prime) when a correction
+    rule needs the position of a prime rather than its value. Accepts a
+    scalar or an ndarray and returns the matching shape.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    pos = np.searchsorted(prime_arr, values)
+    pos_clipped = np.minimum(pos, len(prime_arr) - 1)
+    idx = np.where(prime_arr[pos_clipped] == values, pos_clipped, -1)
+    return int(idx) if idx.ndim == 0 else idx
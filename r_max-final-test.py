@@ -15,45 +15,140 @@
 #
 # ==============================================================================
 
-import math
+import collections
+import os
 import time
-import random
+
+import numpy as np
+
+from prime_sieve import load_primes_from_file
+
+# Numba is optional: without it the kernel below runs as an interpreted
+# Python loop — slow under CPython, but a workable target for PyPy's JIT.
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def wrap(func):
+            return func
+        return wrap
 
 # --- Configuration ---
-PRIME_INPUT_FILE = "primes_100m.txt" 
+CACHE_DIR = os.path.expanduser("~/.cache/prime_anchor")
+PRIME_INPUT_FILE = "primes_100m.txt"
 # 50M pairs is the definitive test
-MAX_PRIME_PAIRS_TO_TEST = 50000000      
+MAX_PRIME_PAIRS_TO_TEST = 50000000
 
 # Search limits for our three systems
 MAX_RADIUS_LIMIT = 30           # System A
 RANDOM_SEARCH_LIMIT = 100         # System B & C
+PROGRESS_INTERVAL = 1000000     # Pairs per kernel call between progress updates
 
-# --- Function to load primes from a file ---
-def load_primes_from_file(filename):
-    """Loads a list of primes from a text file."""
-    print(f"Loading primes from {filename}...")
-    start_time = time.time()
-    try:
-        with open(filename, 'r') as f:
-            prime_list = [int(line.strip()) for line in f]
-    except FileNotFoundError:
-        print(f"FATAL ERROR: The prime file '{filename}' was not found.")
-        return None
-    end_time = time.time()
-    print(f"Loaded {len(prime_list):,} primes in {end_time - start_time:.2f} seconds.")
-    return prime_list
-
-def is_clean_k(k_val, prime_set):
+def build_odd_prime_bits(primes, limit):
+    """Packs the odd primes up to 'limit' into a bitmap, bit j = 2j+1.
+
+    Every distance this test probes is odd (an even anchor minus an odd
+    prime), so one bit per odd integer covers all of them in ~limit/16
+    bytes, and a membership probe becomes a shift-and-mask load instead
+    of a 27-level bisection of the prime array. The zero tail past the
+    last prime reads as "not prime", which is what the old scan
+    concluded there too.
+    """
+    bits = np.zeros(((limit >> 1) >> 3) + 1, dtype=np.uint8)
+    odd = primes[primes > 2] >> 1
+    np.bitwise_or.at(bits, odd >> 3, (np.uint8(1) << (odd & 7).astype(np.uint8)))
+    return bits
+
+@njit("int64(uint8[::1], int64)", cache=True)
+def odd_prime_bit(bits, x):
+    """Bitmap membership probe; even x (never prime here) exits early."""
+    if x & 1 == 0:
+        return 0
+    j = x >> 1
+    return (bits[j >> 3] >> (j & 7)) & 1
+
+@njit("boolean(int64, uint8[::1])", cache=True)
+def is_clean_k(k_val, prime_bits):
     """Helper function to check if k is 1 or a prime."""
     if k_val == 1:
         return True
-    if k_val in prime_set:
-        return True
-    return False
+    # Every k probed here is odd, so any multiple of 3 other than 3
+    # itself is composite: one cheap remainder settles a third of all
+    # probes without touching the bitmap.
+    if k_val % 3 == 0:
+        return k_val == 3
+    return odd_prime_bit(prime_bits, k_val) == 1
+
+@njit("void(int64[::1], int64[::1], uint8[::1], int64, int64, int64, "
+      "int64[::1], int64[::1], int64[::1])",
+      parallel=True, cache=True)
+def control_kernel(primes, S, prime_bits, start, stop, max_radius,
+                   out_q, out_k, out_r):
+    """Law I detection plus the System A radius search over [start, stop).
+
+    Pure integer arithmetic plus bitmap probes — exactly
+    the shape of loop where CPython bytecode dispatch, not the algorithm,
+    is the bottleneck, so the deterministic per-pair work lives in one
+    compiled kernel. Pairs are independent, so the loop runs under
+    prange; each iteration owns one slot per output array and nothing
+    else, keeping the parallel body free of shared state. Per pair,
+    out_q holds the nearest prime if that pair is a Law I failure (-1
+    otherwise), out_k its composite k, and out_r the System A correction
+    radius (-1 if System A failed to correct). The random control
+    systems B and C run over these markers afterwards as batched NumPy
+    passes rather than inside this loop; the driver also reduces the
+    markers into the counters and failure records, and handles a System
+    A failure the way the original loop's break did.
+    """
+    for i in prange(start, stop):
+        row = i - start
+        out_q[row] = -1
+        anchor_sum = S[i]
+
+        # --- 1. Find a Law I Failure ---
+        # Anchor sums are even, so they never equal a prime: the nearest
+        # primes bracket the anchor at positions pos-1 and pos, found by
+        # one bisection instead of an outward probe scan. Ties go to the
+        # lower side, matching the old probe order.
+        pos = np.searchsorted(primes, anchor_sum)
+        if pos >= primes.size:
+            continue  # beyond the loaded range; the old scan found nothing
+        below = anchor_sum - primes[pos - 1]
+        above = primes[pos] - anchor_sum
+        if below <= above:
+            min_distance_k = below
+            q_prime = primes[pos - 1]
+        else:
+            min_distance_k = above
+            q_prime = primes[pos]
+
+        if min_distance_k > 2000: continue # Safety cap, matching the old scan
+
+        is_k_composite = (min_distance_k > 1) and odd_prime_bit(prime_bits, min_distance_k) == 0
+
+        if is_k_composite:
+            out_q[row] = q_prime
+            out_k[row] = min_distance_k
+
+            # --- 2. Test System A (Your Law III) ---
+            out_r[row] = -1
+            for r in range(1, max_radius + 1):
+                s_prev = S[i - r]
+                s_next = S[i + r]
+
+                if is_clean_k(abs(s_prev - q_prime), prime_bits) or is_clean_k(abs(s_next - q_prime), prime_bits):
+                    out_r[row] = r
+                    break
 
 # --- Main Testing Logic ---
 def run_final_control_test():
-    
+
     prime_list = load_primes_from_file(PRIME_INPUT_FILE)
     if prime_list is None: return
 
@@ -62,128 +157,218 @@ def run_final_control_test():
         print("\nFATAL ERROR: The loaded prime file is too small for this test.")
         return
 
-    print("\nSafety check passed. Creating prime set for fast lookups...")
-    prime_set = set(prime_list)
-    print("Prime set created. Starting analysis...")
+    # Membership probes go through a packed bitmap (~p_max/16 bytes, vs
+    # ~80 bytes per entry for the old Python set); only the nearest-prime
+    # bisection still touches the sorted array, since it needs the
+    # prime's value, not just membership. Sized past the largest possible
+    # probe: anchor sums plus slack for the randomized control anchors.
+    print("\nSafety check passed. Packing prime bitmap for fast lookups...")
+    primes = np.asarray(prime_list, dtype=np.int64)
+    prime_bits = build_odd_prime_bits(primes, 2 * int(primes[-1]) + 2048)
+    # Anchor sums S_n = p_n + p_{n+1}, computed once as a single vector
+    # add; the kernel indexes this array for the true anchor and every
+    # correction anchor instead of re-adding prime pairs per radius.
+    S = primes[:-1] + primes[1:]
+    print("Prime bitmap packed. Starting analysis...")
 
     print(f"\nStarting \"Final Control Test\" for {MAX_PRIME_PAIRS_TO_TEST:,} pairs...")
     print(f"  - Testing System A (True S_n) vs. System B (Mod 6 Random) vs. System C (Even Random)")
     print("-" * 80)
     start_time = time.time()
-    
+
     # --- Data structures for Test 5 ---
     total_law_I_failures = 0
-    
+
     # System A (True System)
-    true_system_failures = [] 
+    true_system_failures = []
     max_r_observed = 0
-    
-    # System B (Mod 6 Random)
-    mod6_random_failures = [] 
+
+    # System B (Mod 6 Random). Only the counts feed the final report,
+    # so keep a counter plus a bounded sample of the first few records
+    # (for interactive inspection) instead of a dict per uncorrected
+    # failure — System C fails by design, so at 50M pairs its list ran
+    # to millions of dicts that were never printed.
+    mod6_random_failure_count = 0
+    mod6_failure_samples = collections.deque(maxlen=50)
     max_c_mod6_observed = 0
-    
+
     # System C (Even Random)
-    even_random_failures = [] 
+    even_random_failure_count = 0
+    even_failure_samples = collections.deque(maxlen=50)
     max_c_even_observed = 0
-    
-    start_index = MAX_RADIUS_LIMIT + 1 
-    
-    for i in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1):
-        if i % 100000 == 0:
-            elapsed = time.time() - start_time
-            print(f"Progress: {i:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Law I Fails: {total_law_I_failures:,} | Max r: {max_r_observed} | Max c_mod6: {max_c_mod6_observed} | Max c_even: {max_c_even_observed}", end='\r')
 
-        p_n = prime_list[i]
-        p_n_plus_1 = prime_list[i+1]
-        anchor_sum = p_n + p_n_plus_1
+    start_index = MAX_RADIUS_LIMIT + 1
 
-        # --- 1. Find a Law I Failure ---
-        min_distance_k = 0
-        q_prime = 0
-        search_dist = 1
-        while True:
-            if search_dist > 2000: break 
-            
-            q_lower = anchor_sum - search_dist
-            q_upper = anchor_sum + search_dist
-
-            if q_lower in prime_set:
-                min_distance_k = search_dist
-                q_prime = q_lower
-                break
-            if q_upper in prime_set:
-                min_distance_k = search_dist
-                q_prime = q_upper
-                break
-            search_dist += 1
-        
-        if min_distance_k == 0: continue 
-
-        is_k_composite = (min_distance_k > 1) and (min_distance_k not in prime_set)
-        
-        if is_k_composite:
-            total_law_I_failures += 1
-            failure_details = {
-                "n_index": i, 
-                "S_n": anchor_sum, 
-                "q_prime": q_prime, 
-                "k_composite": min_distance_k
-            }
-            
-            # --- 2. Test System A (Your Law III) ---
-            is_true_system_corrected = False
-            for r in range(1, MAX_RADIUS_LIMIT + 1):
-                s_prev = prime_list[i - r] + prime_list[i - r + 1]
-                s_next = prime_list[i + r] + prime_list[i + r + 1]
-
-                if is_clean_k(abs(s_prev - q_prime), prime_set) or is_clean_k(abs(s_next - q_prime), prime_set):
-                    is_true_system_corrected = True
-                    if r > max_r_observed: max_r_observed = r
-                    break 
-            
-            if not is_true_system_corrected:
-                true_system_failures.append(failure_details)
-                print("\nFATAL: Law III Falsified. Stopping.")
-                break 
-
-            # --- Define Neighborhood for Random Tests ---
-            avg_gap = (prime_list[i+10] - prime_list[i-10]) / 20 
-            neighborhood_radius = int(avg_gap * MAX_RADIUS_LIMIT) 
-            if neighborhood_radius <= 0: neighborhood_radius = 500 
-            
-            # --- 3. Test System B (Mod 6 Random) ---
-            is_mod6_random_corrected = False
-            for c in range(1, RANDOM_SEARCH_LIMIT + 1):
-                rand_offset = random.randint(-neighborhood_radius, neighborhood_radius)
-                s_control_base = anchor_sum + rand_offset
-                s_control_mod6 = s_control_base - (s_control_base % 6) # Force Mod 6
-
-                if is_clean_k(abs(s_control_mod6 - q_prime), prime_set):
-                    is_mod6_random_corrected = True
-                    if c > max_c_mod6_observed: max_c_mod6_observed = c
-                    break 
-            
-            if not is_mod6_random_corrected:
-                failure_details_b = failure_details.copy()
-                failure_details_b['attempts_made'] = RANDOM_SEARCH_LIMIT
-                mod6_random_failures.append(failure_details_b)
-
-            # --- 4. Test System C (Even Random) ---
-            is_even_random_corrected = False
-            for e in range(1, RANDOM_SEARCH_LIMIT + 1):
-                rand_offset = random.randint(-neighborhood_radius, neighborhood_radius)
-                s_control_base = anchor_sum + rand_offset
-                s_control_even = s_control_base if s_control_base % 2 == 0 else s_control_base + 1 # Force Even
-
-                if is_clean_k(abs(s_control_even - q_prime), prime_set):
-                    is_even_random_corrected = True
-                    if e > max_c_even_observed: max_c_even_observed = e
+    # Seeded generator for the control offsets: batch draws at C speed
+    # instead of one RNG call per control attempt, and reproducible runs.
+    rng = np.random.default_rng(seed=0)
+
+    # Per-chunk failure markers from the kernel (one slot per pair); the
+    # driver reduces them into counters, maxima and failure records.
+    out_q = np.empty(PROGRESS_INTERVAL, dtype=np.int64)
+    out_k = np.empty(PROGRESS_INTERVAL, dtype=np.int64)
+    out_r = np.empty(PROGRESS_INTERVAL, dtype=np.int64)
+
+    # The deterministic scan — the failure set and the System A radii —
+    # is a pure function of the prime file and the scan parameters, so
+    # it is cached on disk keyed by both (same scheme as the heuristics
+    # script's bitmap cache). Repeat runs, e.g. while iterating on the
+    # control systems, replay the markers from the cache and skip the
+    # kernel entirely.
+    scan_cache_path = os.path.join(
+        CACHE_DIR,
+        f"law1_scan_{primes.size}_{int(primes[-1])}_{start_index}_"
+        f"{MAX_PRIME_PAIRS_TO_TEST}_{MAX_RADIUS_LIMIT}.npz")
+    cached_scan = None
+    if os.path.exists(scan_cache_path):
+        print(f"Loading cached Law I scan from {scan_cache_path}...")
+        data = np.load(scan_cache_path)
+        cached_scan = (data['idx'], data['q'], data['k'], data['r'])
+    scan_idx_chunks = []
+    scan_q_chunks = []
+    scan_k_chunks = []
+    scan_r_chunks = []
+    scan_complete = False
+
+    # The kernel contains no progress logic; the driver hands it
+    # PROGRESS_INTERVAL pairs per call and prints between calls.
+    last_progress = time.monotonic()
+    for chunk_start in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1, PROGRESS_INTERVAL):
+        chunk_stop = min(chunk_start + PROGRESS_INTERVAL, MAX_PRIME_PAIRS_TO_TEST + 1)
+        n_rows = chunk_stop - chunk_start
+        if cached_scan is not None:
+            c_idx, c_q, c_k, c_r = cached_scan
+            lo = np.searchsorted(c_idx, chunk_start)
+            hi = np.searchsorted(c_idx, chunk_stop)
+            rows = c_idx[lo:hi] - chunk_start
+            out_q[:n_rows] = -1
+            out_q[rows] = c_q[lo:hi]
+            out_k[rows] = c_k[lo:hi]
+            out_r[rows] = c_r[lo:hi]
+        else:
+            control_kernel(primes, S, prime_bits, chunk_start, chunk_stop,
+                           MAX_RADIUS_LIMIT,
+                           out_q, out_k, out_r)
+
+        # A prange kernel cannot break mid-chunk; if System A failed to
+        # correct a pair, discard everything after that row so the
+        # totals match the original loop's stop-on-first-failure.
+        fail_rows = np.flatnonzero(out_q[:n_rows] >= 0)
+        if cached_scan is None:
+            scan_idx_chunks.append(chunk_start + fail_rows)
+            scan_q_chunks.append(out_q[fail_rows].copy())
+            scan_k_chunks.append(out_k[fail_rows].copy())
+            scan_r_chunks.append(out_r[fail_rows].copy())
+        uncorrected = fail_rows[out_r[fail_rows] < 0]
+        law3_row = int(uncorrected[0]) if uncorrected.size > 0 else -1
+        if law3_row >= 0:
+            total_law_I_failures += 1  # counted before its System A test
+            # The original broke before running the controls on this row.
+            fail_rows = fail_rows[fail_rows < law3_row]
+
+        total_law_I_failures += fail_rows.size
+        if fail_rows.size > 0:
+            max_r_observed = max(max_r_observed, int(out_r[fail_rows].max()))
+
+            # --- Systems B and C (random controls), batched over the chunk ---
+            # One offset matrix per control system for every failure at
+            # once — uniform over [-radius, radius] with the same
+            # local-average-gap radius the per-call version used — then
+            # the mod-6 / even transform, the distance to the failure's
+            # nearest prime, and the bisection membership test all run
+            # as whole-matrix operations. A control "corrects" at the
+            # first clean attempt, so the attempt count is the first
+            # True column (0 when every attempt failed).
+            idx = chunk_start + fail_rows
+            q = out_q[fail_rows]
+            # Average-gap neighborhood in pure integer arithmetic:
+            # gap_window * MAX_RADIUS_LIMIT // 20 instead of the float
+            # avg_gap = gap_window / 20 detour, whose rounding could
+            # land one off the exact value.
+            radii = (primes[idx + 10] - primes[idx - 10]) * MAX_RADIUS_LIMIT // 20
+            radii[radii <= 0] = 500
+
+            offsets = rng.integers(-radii[:, None], radii[:, None] + 1,
+                                   size=(fail_rows.size, RANDOM_SEARCH_LIMIT),
+                                   dtype=np.int64)
+            s_control = S[idx][:, None] + offsets
+            s_control -= s_control % 6 # Force Mod 6
+            # k is always odd here (even control anchor minus an odd
+            # prime), so the bitmap probe needs no parity guard.
+            k = np.abs(s_control - q[:, None])
+            j = k >> 1
+            k_is_prime = (prime_bits[j >> 3] >> (j & 7)) & 1
+            clean = (k == 1) | (k_is_prime == 1)
+            b_attempts = np.where(clean.any(axis=1), clean.argmax(axis=1) + 1, 0)
+
+            offsets = rng.integers(-radii[:, None], radii[:, None] + 1,
+                                   size=(fail_rows.size, RANDOM_SEARCH_LIMIT),
+                                   dtype=np.int64)
+            s_control = S[idx][:, None] + offsets
+            s_control += s_control % 2 # Force Even
+            k = np.abs(s_control - q[:, None])
+            j = k >> 1
+            k_is_prime = (prime_bits[j >> 3] >> (j & 7)) & 1
+            clean = (k == 1) | (k_is_prime == 1)
+            e_attempts = np.where(clean.any(axis=1), clean.argmax(axis=1) + 1, 0)
+
+            max_c_mod6_observed = max(max_c_mod6_observed, int(b_attempts.max()))
+            max_c_even_observed = max(max_c_even_observed, int(e_attempts.max()))
+
+            mod6_random_failure_count += int(np.count_nonzero(b_attempts == 0))
+            even_random_failure_count += int(np.count_nonzero(e_attempts == 0))
+
+            # Record dicts are built only for the bounded samples.
+            for row_i in np.flatnonzero((b_attempts == 0) | (e_attempts == 0)):
+                if (len(mod6_failure_samples) >= mod6_failure_samples.maxlen
+                        and len(even_failure_samples) >= even_failure_samples.maxlen):
                     break
-            
-            if not is_even_random_corrected:
-                failure_details_c = failure_details.copy()
-                failure_details_c['attempts_made'] = RANDOM_SEARCH_LIMIT
-                even_random_failures.append(failure_details_c)
+                i = int(idx[row_i])
+                failure_details = {
+                    "n_index": i,
+                    "S_n": int(S[i]),
+                    "q_prime": int(q[row_i]),
+                    "k_composite": int(out_k[fail_rows[row_i]]),
+                    "attempts_made": RANDOM_SEARCH_LIMIT
+                }
+                if b_attempts[row_i] == 0 and len(mod6_failure_samples) < mod6_failure_samples.maxlen:
+                    mod6_failure_samples.append(failure_details)
+                if e_attempts[row_i] == 0 and len(even_failure_samples) < even_failure_samples.maxlen:
+                    even_failure_samples.append(failure_details)
+
+        if law3_row >= 0:
+            i = chunk_start + law3_row
+            true_system_failures.append({
+                "n_index": i,
+                "S_n": int(S[i]),
+                "q_prime": int(out_q[law3_row]),
+                "k_composite": int(out_k[law3_row])
+            })
+            print("\nFATAL: Law III Falsified. Stopping.")
+            break
+
+        # Throttle progress output to once a second; on fast runs the
+        # thousands-separator formatting and terminal writes otherwise
+        # dominate the driver loop.
+        now = time.monotonic()
+        if now - last_progress >= 1.0:
+            last_progress = now
+            elapsed = time.time() - start_time
+            print(f"Progress: {chunk_stop - 1:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Law I Fails: {total_law_I_failures:,} | Max r: {max_r_observed} | Max c_mod6: {max_c_mod6_observed} | Max c_even: {max_c_even_observed}", end='\r')
+
+    else:
+        scan_complete = True
+
+    # Persist the scan only when it ran to completion (a Law III break
+    # leaves it partial).
+    if cached_scan is None and scan_complete:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.savez_compressed(
+            scan_cache_path,
+            idx=np.concatenate(scan_idx_chunks),
+            q=np.concatenate(scan_q_chunks),
+            k=np.concatenate(scan_k_chunks),
+            r=np.concatenate(scan_r_chunks))
 
     print(f"Progress: {MAX_PRIME_PAIRS_TO_TEST:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Law I Fails: {total_law_I_failures:,} | Max r: {max_r_observed} | Max c_mod6: {max_c_mod6_observed} | Max c_even: {max_c_even_observed}")
     print(f"\nAnalysis completed in {time.time() - start_time:.2f} seconds.")
@@ -192,7 +377,7 @@ def run_final_control_test():
     # --- Final Reports ---
     print("\n" + "="*20 + " TEST 5: FINAL CONTROL TEST REPORT " + "="*20)
     print(f"\nTotal Law I Failures (Composite k) Analyzed: {total_law_I_failures:,}")
-    
+
     # --- System A Report ---
     print("\n" + "-"*20 + " System A: 'Prime Anchor System' (Your $S_n$) " + "-"*20)
     print(f"  Total Uncorrected Failures: {len(true_system_failures)}")
@@ -200,22 +385,22 @@ def run_final_control_test():
 
     # --- System B Report ---
     print("\n" + "-"*20 + " System B: 'Mod 6 Random' Control " + "-"*20)
-    print(f"  Total Uncorrected Failures: {len(mod6_random_failures)}")
+    print(f"  Total Uncorrected Failures: {mod6_random_failure_count}")
     print(f"  Max Correction Count (c_max): {max_c_mod6_observed}")
 
     # --- System C Report ---
     print("\n" + "-"*20 + " System C: 'Even Random' Control " + "-"*20)
-    print(f"  Total Uncorrected Failures: {len(even_random_failures)}")
+    print(f"  Total Uncorrected Failures: {even_random_failure_count}")
     print(f"  Max Correction Count (e_max): {max_c_even_observed}")
-    if len(even_random_failures) > 0:
-        print(f"  (Found {len(even_random_failures):,} failures that could not be corrected in {RANDOM_SEARCH_LIMIT} attempts)")
+    if even_random_failure_count > 0:
+        print(f"  (Found {even_random_failure_count:,} failures that could not be corrected in {RANDOM_SEARCH_LIMIT} attempts)")
 
 
     # --- Final Conclusion ---
     print("\n\n" + "="*20 + " FINAL CONCLUSION " + "="*20)
-    
-    if len(true_system_failures) == 0 and len(mod6_random_failures) == 0:
-        if len(even_random_failures) > 0:
+
+    if len(true_system_failures) == 0 and mod6_random_failure_count == 0:
+        if even_random_failure_count > 0:
             print("\n  [VERDICT: SUCCESS. The 'Mod 6' property is the key.]")
             print("  This is a huge success. The test proves:")
             print("  1. 'Mod 6' anchors (Systems A and B) provide 100% correction.")
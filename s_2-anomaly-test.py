@@ -12,31 +12,51 @@
 # ==============================================================================
 
 import math
+import os
 import time
 
+import numpy as np
+
+from prime_sieve import load_primes_from_file
+
 # --- Configuration ---
 # Use the same prime file your other scripts use
 PRIME_INPUT_FILE = "primes_100m.txt" 
 # 4 million pairs is more than enough to confirm this arithmetic property
-MAX_PRIME_PAIRS_TO_TEST = 4000000      
-
-# --- Function to load primes from a file ---
-def load_primes_from_file(filename):
-    """Loads a list of primes from a text file."""
-    print(f"Loading primes from {filename}...")
-    start_time = time.time()
-    try:
-        with open(filename, 'r') as f:
-            # We assume the file starts with 2, 3, 5, ...
-            # p_list[0]=2, p_list[1]=3, p_list[2]=5, ...
-            prime_list = [int(line.strip()) for line in f]
-    except FileNotFoundError:
-        print(f"FATAL ERROR: The prime file '{filename}' was not found.")
-        print("Please run the 'generate-primes.py' script first.")
-        return None
-    end_time = time.time()
-    print(f"Loaded {len(prime_list):,} primes in {end_time - start_time:.2f} seconds.")
-    return prime_list
+MAX_PRIME_PAIRS_TO_TEST = 4000000
+# Anchors per vectorized block. Sized so one block's worth of anchors,
+# gathered distances and masks (~1.5MB) stays cache-resident between the
+# passes that touch it; the distance-table gather itself walks ascending
+# addresses, so it streams through the prefetcher at any block size.
+BATCH_SIZE = 65536
+
+def build_nearest_prime_dist(prime_list, limit):
+    """Distance from every integer in [0, limit] to the nearest loaded prime.
+
+    Two accumulate sweeps over the value range — forward for the latest
+    prime at or below x, backward for the earliest at or above — make
+    each anchor's k_min one int32 load, replacing even the per-batch
+    binary search. Retains 4 bytes per value (plus ~24 transient during
+    the build), amortized across every anchor in the run.
+    """
+    n = limit + 1
+    primes = np.asarray(prime_list, dtype=np.int64)
+    primes = primes[primes <= limit]
+
+    # Sentinels far outside the range make "no prime on this side" lose
+    # every np.minimum below, matching a failed outward probe.
+    marker = np.full(n, -2 * n, dtype=np.int64)
+    marker[primes] = primes
+    np.maximum.accumulate(marker, out=marker)
+    pos = np.arange(n, dtype=np.int64)
+    d_prev = pos - marker
+
+    marker = np.full(n, 3 * n, dtype=np.int64)
+    marker[primes] = primes
+    marker = np.minimum.accumulate(marker[::-1])[::-1]
+    d_next = marker - pos
+
+    return np.minimum(d_prev, d_next).astype(np.int32)
 
 # --- Main Testing Logic ---
 def run_s2_anomaly_test():
@@ -61,9 +81,23 @@ def run_s2_anomaly_test():
         print("="*80)
         return
 
-    print("\nSafety check passed. Creating prime set for fast lookups...")
-    prime_set = set(prime_list)
-    print("Prime set created. Starting analysis...")
+    # A dense uint8 sieve turns the compositeness test into one indexed
+    # load. generate-prime.py persists this sieve, so prefer memory-
+    # mapping it — only the pages actually probed (small k values) ever
+    # fault in. The built fallback is sized to the largest anchor tested
+    # plus the 1000-step search cap, so every probe stays in bounds.
+    anchor_max = prime_list[MAX_PRIME_PAIRS_TO_TEST] + prime_list[MAX_PRIME_PAIRS_TO_TEST + 1]
+    prime_arr = np.asarray(prime_list, dtype=np.int64)
+    sieve_path = os.path.splitext(PRIME_INPUT_FILE)[0] + '.sieve'
+    if os.path.exists(sieve_path) and os.path.getsize(sieve_path) >= anchor_max + 1002:
+        print(f"\nSafety check passed. Memory-mapping prime sieve from {sieve_path}...")
+        is_prime = np.memmap(sieve_path, dtype=np.uint8, mode='r')
+    else:
+        print("\nSafety check passed. Building prime sieve for fast lookups...")
+        is_prime = np.zeros(anchor_max + 1002, dtype=np.uint8)
+        is_prime[prime_arr[prime_arr < anchor_max + 1002]] = 1
+    nearest_dist = build_nearest_prime_dist(prime_arr, anchor_max + 1002)
+    print("Prime sieve built. Starting analysis...")
 
     print(f"\nStarting Law I failure analysis for {MAX_PRIME_PAIRS_TO_TEST:,} pairs...")
     print("This test will separate failures from S_2=8 from all other anchors.")
@@ -71,8 +105,12 @@ def run_s2_anomaly_test():
     start_time = time.time()
     
     # --- Data structures for Test 1 ---
-    s2_composites = set()
-    other_composites = set()
+    # Flag arrays over k instead of Python sets (same move as the main
+    # tester): marking a k is one indexed store, and the sorted unique
+    # lists fall out of flatnonzero at report time. 64K slots is far
+    # past any nearest-prime distance in range.
+    s2_seen_k = np.zeros(1 << 16, dtype=np.uint8)
+    other_seen_k = np.zeros(1 << 16, dtype=np.uint8)
     
     total_s2_failures = 0
     total_other_failures = 0
@@ -84,46 +122,41 @@ def run_s2_anomaly_test():
     # i=2: S_3 = p_list[2] + p_list[3] = 5 + 7 = 12 (This is the first "other")
     
     start_index = 1 # Start at i=1 to get S_2
-    
-    for i in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1):
-        if i % 100000 == 0:
-            elapsed = time.time() - start_time
-            print(f"Progress: {i:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Time: {elapsed:.0f}s", end='\r')
-
-        p_n = prime_list[i]
-        p_n_plus_1 = prime_list[i+1]
-        anchor_sum = p_n + p_n_plus_1
-
-        # --- Find k_min (Same logic as your script) ---
-        min_distance_k = 0
-        search_dist = 1
-        while True:
-            # We only need to check k up to a reasonable bound.
-            # If the closest prime is > 1000 away, it's not relevant.
-            if search_dist > 1000:
-                break 
-            
-            if (anchor_sum - search_dist) in prime_set or (anchor_sum + search_dist) in prime_set:
-                min_distance_k = search_dist
-                break
-            search_dist += 1
-        
-        if min_distance_k == 0: continue # Skip if no prime found nearby
-
-        is_k_composite = (min_distance_k > 1) and (min_distance_k not in prime_set)
-        
-        if is_k_composite:
-            # This is the core of Test 1:
-            # Log the failure to the correct set.
-            if i == 1: 
+
+    # Anchor sums S_n = p_n + p_{n+1}, computed once as a single vector
+    # add; the batched Law I pass below just slices this array.
+    anchors = prime_arr[:-1] + prime_arr[1:]
+
+    for batch_start in range(start_index, MAX_PRIME_PAIRS_TO_TEST + 1, BATCH_SIZE):
+        batch_end = min(batch_start + BATCH_SIZE, MAX_PRIME_PAIRS_TO_TEST + 1)
+        batch = anchors[batch_start:batch_end]
+
+        # --- Vectorized Law I pass over the whole batch ---
+        # Every nearest-prime distance is one gather from the value-
+        # indexed table — no search at all. The 1000-step cap of the old
+        # scan is kept as an explicit filter.
+        k_min = nearest_dist[batch]
+
+        candidate_offsets = np.flatnonzero((k_min > 1) & (k_min <= 1000))
+
+        # Only the rare candidates reach Python: classify each by the
+        # compositeness of k and by its source anchor.
+        for offset in candidate_offsets:
+            min_distance_k = int(k_min[offset])
+            if is_prime[min_distance_k]:
+                continue
+            if batch_start + int(offset) == 1:
                 # This is the S_2 = 3 + 5 = 8 anchor
-                s2_composites.add(min_distance_k)
+                s2_seen_k[min_distance_k] = 1
                 total_s2_failures += 1
             else:
                 # This is any S_n where n > 2
-                other_composites.add(min_distance_k)
+                other_seen_k[min_distance_k] = 1
                 total_other_failures += 1
 
+        elapsed = time.time() - start_time
+        print(f"Progress: {batch_end - 1:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Time: {elapsed:.0f}s", end='\r')
+
     print(f"Progress: {MAX_PRIME_PAIRS_TO_TEST:,} / {MAX_PRIME_PAIRS_TO_TEST:,} | Time: {time.time() - start_time:.0f}s")
     print(f"\nAnalysis completed in {time.time() - start_time:.2f} seconds.")
     print("-" * 80)
@@ -131,32 +164,35 @@ def run_s2_anomaly_test():
     # --- Final Reports ---
     print("\n" + "="*20 + " TEST 1: S_2 ANOMALY REPORT " + "="*20)
 
+    s2_composites = np.flatnonzero(s2_seen_k)
+    other_composites = np.flatnonzero(other_seen_k)
+
     print("\n" + "-"*20 + " Failures from S_2 = 8 " + "-"*20)
     print(f"Total failures (composite k) found for S_2: {total_s2_failures}")
     print("Unique composite k-values found:")
-    print(sorted(list(s2_composites)))
+    print(s2_composites.tolist())
 
     print("\n" + "-"*20 + " Failures from S_n (n > 2) " + "-"*20)
     print(f"Total failures (composite k) found for all other anchors: {total_other_failures:,}")
     print("Unique composite k-values found (sample, first 20):")
-    print(sorted(list(other_composites))[:20])
+    print(other_composites[:20].tolist())
 
     # --- Hypothesis Verification ---
     print("\n\n" + "="*20 + " HYPOTHESIS VERIFICATION " + "="*20)
     
     # 1. Find k-values divisible by 3 from S_2
-    s2_mod3_failures = {k for k in s2_composites if k % 3 == 0}
+    s2_mod3_failures = s2_composites[s2_composites % 3 == 0].tolist()
     print(f"\n[S_2 = 8] Composite k-values divisible by 3:")
     if s2_mod3_failures:
-        print(f"  FOUND: {sorted(list(s2_mod3_failures))}")
+        print(f"  FOUND: {s2_mod3_failures}")
     else:
         print("  FOUND: None")
-        
+
     # 2. Find k-values divisible by 3 from ALL OTHER anchors
-    other_mod3_failures = {k for k in other_composites if k % 3 == 0}
+    other_mod3_failures = other_composites[other_composites % 3 == 0].tolist()
     print(f"\n[S_n, n>2] Composite k-values divisible by 3:")
     if other_mod3_failures:
-        print(f"  FOUND: {sorted(list(other_mod3_failures))}")
+        print(f"  FOUND: {other_mod3_failures}")
     else:
         print("  FOUND: None")
 